@@ -6,6 +6,18 @@ from glob import glob
 import typing
 import sys
 import platform
+import argparse
+import threading
+import time
+import hashlib
+import json
+import re
+import atexit
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try: import resource
+except ImportError: resource = None # Not available on Windows
 
 # TODO:
 # - Make this file never show it's call stack. Call stacks should mean that a child script failed.
@@ -26,6 +38,7 @@ git_heads = {
 wanted_backends = ["vulkan", "sdl2", "opengl3", "sdlrenderer2", "glfw", "dx11", "dx12", "win32", "osx", "metal", "wgpu"]
 # Supported means that an impl bindings file exists, and that it has been tested.
 # Some backends (like dx12, win32) have bindings but not been tested.
+# The impl bindings are generated by gen_odin.py from the backend's header, except where `hand_written` is set.
 backends = {
 	"allegro5":     { "supported": False },
 	"android":      { "supported": False },
@@ -36,10 +49,11 @@ backends = {
 	"dx12":         { "supported": False, "enabled_on": ["windows"] },
 	"glfw":         { "supported": True,  "deps": ["glfw"] },
 	"glut":         { "supported": False },
-	"metal":        { "supported": True,  "enabled_on": ["darwin"] },
+	# dear_bindings can't parse the Objective-C headers of metal and osx
+	"metal":        { "supported": True,  "enabled_on": ["darwin"], "hand_written": True },
 	"opengl2":      { "supported": False },
 	"opengl3":      { "supported": True  },
-	"osx":          { "supported": False, "enabled_on": ["darwin"] },
+	"osx":          { "supported": False, "enabled_on": ["darwin"], "hand_written": True },
 	"sdl2":         { "supported": True,  "deps": ["sdl2"] },
 	"sdl3":         { "supported": False },
 	"sdlrenderer2": { "supported": True,  "deps": ["sdl2"] },
@@ -58,9 +72,101 @@ backend_deps = {
 	"wgpu":   { "repo": "https://github.com/webgpu-native/webgpu-headers.git", "commit": "aef5e42",        "path": "webgpu-headers/webgpu", "include": "webgpu-headers" },
 }
 
+# @CONFIGURE: Directory with local mirrors of the above repositories, eg. `mirrors/imgui.git`, `mirrors/SDL.git`.
+# If set, nothing is fetched from the network. Can also be set with `--mirror-dir`.
+git_mirror_dir = None
+
 # @CONFIGURE:
 compile_debug = False
 
+# Build profiles. Each profile other than debug/release produces its own archive, eg. `imgui_linux_x64_lto.a`
+build_profiles = {
+	"debug":       { "archive_suffix": "",     "flags": { "windows": ["/Od", "/Z7"], "linux, darwin": ["-g", "-O0"] } },
+	"release":     { "archive_suffix": "",     "flags": { "windows": ["/O2"],        "linux, darwin": ["-O3"] } },
+	# Objects contain LLVM bitcode (or MSVC /GL code), so link time optimization can happen across
+	# imgui and your program. Your program has to be linked with an LTO capable linker, eg. `-linker:lld`.
+	"release-lto": { "archive_suffix": "_lto", "flags": { "windows": ["/O2", "/GL"], "linux, darwin": ["-O3"] }, "lto": True },
+	# Profile guided optimization. Builds an instrumented library, runs examples/null against it
+	# to collect a profile, then builds again using that profile. Clang only, and needs `odin` and `llvm-profdata`.
+	"release-pgo": { "archive_suffix": "_pgo", "flags": { "windows": ["/O2"],        "linux, darwin": ["-O3"] }, "pgo": True },
+}
+
+# @CONFIGURE: Must be key into above table. Can be overridden with `--profile`.
+build_profile = "debug" if compile_debug else "release"
+# @CONFIGURE: "thin" or "full". Only used by the release-lto profile, on clang. Can be overridden with `--lto`.
+lto_mode = "thin"
+# @CONFIGURE: How many times the PGO training workload (examples/null) is run.
+pgo_training_runs = 3
+pgo_dir = path.join("build_cache", "pgo")
+
+# Targets which can be built side by side, eg. every Linux archive on one Linux machine. Each is compiled with clang's `--target`,
+# and `--sysroot` if set, eg. to `/usr/aarch64-linux-gnu`. Without a sysroot, clang finds cross toolchains installed next to the host's.
+# Targets have to be for the system building, as the enabled backends, and the SDKs they need, differ between systems.
+build_targets = {
+	"linux-x64":    { "system": "Linux",  "arch": "x64",   "triple": "x86_64-linux-gnu",    "sysroot": None },
+	"linux-arm64":  { "system": "Linux",  "arch": "arm64", "triple": "aarch64-linux-gnu",   "sysroot": None },
+	"darwin-x64":   { "system": "Darwin", "arch": "x64",   "triple": "x86_64-apple-macos11", "sysroot": None },
+	"darwin-arm64": { "system": "Darwin", "arch": "arm64", "triple": "arm64-apple-macos11",  "sysroot": None },
+}
+# @CONFIGURE: Keys into above table, built concurrently, each with its own object cache. If empty, only the host is built.
+# Can be overridden with `--targets`.
+wanted_targets = []
+
+# @CONFIGURE: How many compiler processes to run at once. Can be overridden with `-j N`.
+compile_jobs = os.cpu_count() or 1
+
+# @CONFIGURE: Compiled objects are kept here between builds, keyed on preprocessed source, flags and compiler version.
+# Unlike `temp`, this folder is never cleared by the build. Can be disabled with `--no-cache`.
+object_cache_dir = path.join("build_cache", "objects")
+# @CONFIGURE: If above 0, the core's sources are amalgamated into this many translation units (unity build) before compiling.
+# The backends are always compiled separately, as each goes into its own archive.
+# This saves parsing the imgui headers once per source, and lets the compiler inline across imgui's files.
+# The shards are compiled in parallel. Can be overridden with `--unity N`.
+unity_shards = 0
+
+# Records the inputs and outputs of each build stage, so that stages can be skipped when nothing changed.
+# Can be ignored with `--force`.
+manifest_path = path.join("build_cache", "manifest.json")
+# dear_bindings output is kept here, rather than in `temp`, so it survives when the stage is skipped
+bindings_dir = path.join("build_cache", "bindings")
+
+# Where the Chrome trace-event file (open it in chrome://tracing or https://ui.perfetto.dev) is written.
+# A plain text summary is written next to it. Can be overridden with `--trace`.
+build_trace_path = path.join("build_cache", "build_trace.json")
+
+# @CONFIGURE: If true, the bindings are split into a file per section (imgui_enums.odin, imgui_functions.odin, ...),
+# instead of one imgui.odin. Only files whose content changed are rewritten.
+split_bindings = False
+
+# @CONFIGURE: Path to an Odin project. If set, the core archive only keeps the imgui procs the project references,
+# plus whatever those, and the enabled backends, need. Can be overridden with `--strip-unused`.
+strip_unused_project = None
+# Which procs were kept, and how much smaller the core archive got
+strip_report_path = path.join("build_cache", "strip_report.txt")
+# @CONFIGURE: If true, a small C program measures the size of every struct in c_imgui.h, and the offset of every field.
+# The bindings then #assert that the Odin structs match, so a wrong struct fails to compile, instead of corrupting memory.
+verify_struct_layout = True
+layout_dir = path.join("build_cache", "layout")
+
+# @CONFIGURE: If true, and odin is available, examples/inline_check is built against the core archive and run after building.
+# It checks that the procs gen_odin.py writes in Odin, instead of binding, give the same results as imgui's C functions.
+check_inline_procs = True
+inline_check_dir = path.join("build_cache", "inline_check")
+
+# @CONFIGURE: How many frames each scene of examples/null_benchmark is measured for, with `--frame-benchmark`
+frame_benchmark_frames = 600
+# Results are written here as `<profile>_<imgui commit>.json`
+frame_benchmark_dir = path.join("build_cache", "frame_benchmark")
+
+# @CONFIGURE: How often `--watch` checks whether anything changed
+watch_poll_seconds = 0.25
+
+# Which default argument helpers gen_odin.py bound straight to their full-argument function, and which proc groups it wrote
+helper_report_path = path.join("build_cache", "helper_report.txt")
+
+# @CONFIGURE: Once the object cache grows past this, the least recently used objects are evicted.
+object_cache_max_bytes = 2 * 1024 * 1024 * 1024
+
 platform_win32_like = platform.system() == "Windows"
 platform_unix_like = platform.system() == "Linux" or platform.system() == "Darwin"
 
@@ -75,34 +181,301 @@ def hashes_are_same_ish(first: str, second: str) -> bool:
 	assertx(smallest_hash_size >= 7, "Hashes not long enough to be sure")
 	return first[:smallest_hash_size] == second[:smallest_hash_size]
 
-def exec(cmd: typing.List[str], what: str) -> str:
+# BUILD TRACE
+# Every stage, command and compiled file is recorded as an event, with its wall and CPU time.
+build_trace_start = time.perf_counter()
+build_trace_events = []
+build_trace_lock = threading.Lock()
+build_trace_threads = {}
+
+def cpu_time() -> float:
+	""" CPU time used by this process and its finished child processes """
+	if resource == None: return time.process_time()
+	self_usage = resource.getrusage(resource.RUSAGE_SELF)
+	children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return self_usage.ru_utime + self_usage.ru_stime + children_usage.ru_utime + children_usage.ru_stime
+
+def wait_with_cpu_time(process: subprocess.Popen) -> typing.Tuple[bytes, float]:
+	""" Like process.communicate(), but also returns the CPU time used by the process.
+	This is None where the platform can't tell us (Windows). Assumes only stdout is piped. """
+	if not hasattr(os, "wait4"): return [process.communicate()[0], None]
+	output = process.stdout.read()
+	process.stdout.close()
+	[_pid, status, usage] = os.wait4(process.pid, 0)
+	process.returncode = os.waitstatus_to_exitcode(status)
+	return [output, usage.ru_utime + usage.ru_stime]
+
+def trace_event(name: str, category: str, start: float, cpu: float = None, **args):
+	""" Records an event which started at `start` (from time.perf_counter()) and ends now """
+	end = time.perf_counter()
+	with build_trace_lock:
+		thread = build_trace_threads.setdefault(threading.get_ident(), len(build_trace_threads))
+		build_trace_events.append({
+			"name": name, "cat": category, "ph": "X", "pid": 0, "tid": thread,
+			"ts": (start - build_trace_start) * 1e6, "dur": (end - start) * 1e6,
+			"args": { "cpu_seconds": cpu, **args },
+		})
+
+@contextlib.contextmanager
+def traced_stage(name: str):
+	""" Records the wall and CPU time of a build stage. The CPU time includes every child process that finished
+	during the stage, so it's only recorded for stages on the main thread, where nothing else runs alongside. """
+	start = time.perf_counter()
+	cpu_start = cpu_time()
+	try: yield
+	finally: trace_event(name, "stage", start, cpu_time() - cpu_start if threading.current_thread() == threading.main_thread() else None)
+
+def format_seconds(seconds: float) -> str:
+	if seconds == None: return "-"
+	return f"{seconds:.2f}s"
+
+def format_trace_summary(slowest_count: int = 10) -> str:
+	""" Table of stages, and the slowest compiled files and commands, sorted by wall time """
+	with build_trace_lock: events = list(build_trace_events)
+
+	lines = []
+	def table(title: str, rows):
+		rows = sorted(rows, key=lambda event: event["dur"], reverse=True)
+		if len(rows) == 0: return
+		name_len = max(len(title), max(len(event["name"]) for event in rows))
+		lines.append(title + " " * (name_len - len(title)) + "        wall         cpu")
+		for event in rows:
+			extra = f'  ({event["args"]["result"]})' if "result" in event["args"] else ""
+			wall = format_seconds(event["dur"] / 1e6)
+			cpu = format_seconds(event["args"]["cpu_seconds"])
+			lines.append(event["name"] + " " * (name_len - len(event["name"])) + f"  {wall:>10}  {cpu:>10}{extra}")
+		lines.append("")
+
+	table("Stage", [event for event in events if event["cat"] == "stage"])
+	compiles = [event for event in events if event["cat"] == "compile"]
+	commands = [event for event in events if event["cat"] == "exec"]
+	table(f"Slowest files (of {len(compiles)})", sorted(compiles, key=lambda event: event["dur"], reverse=True)[:slowest_count])
+	table(f"Slowest commands (of {len(commands)})", sorted(commands, key=lambda event: event["dur"], reverse=True)[:slowest_count])
+
+	return "\n".join(lines)
+
+def write_build_trace(trace_path: str):
+	""" Writes the trace-event file, and a text summary next to it """
+	with build_trace_lock:
+		events = list(build_trace_events)
+
+	os.makedirs(path.dirname(path.abspath(trace_path)), exist_ok=True)
+	with open(trace_path, "w") as f:
+		json.dump({ "traceEvents": events, "displayTimeUnit": "ms" }, f)
+	with open(path.splitext(trace_path)[0] + "_summary.txt", "w") as f:
+		f.write(format_trace_summary())
+
+def print_exec_line(cmd: typing.List[str], what: str):
 	max_what_len = 40
 	if len(what) > max_what_len:
 		what = what[:max_what_len - 2] + ".."
-	print(what + (" " * (max_what_len - len(what))) + "> " + " ".join(cmd))
-	try: subprocess.check_output(cmd)
-	except subprocess.CalledProcessError as uh_oh:
-		print("=" * 80)
-		print("FAILED")
-		print("=" * 80)
-		print(uh_oh.output.decode())
+	# Written in one go, so lines of targets building side by side don't run into each other
+	print(what + (" " * (max_what_len - len(what))) + "> " + " ".join(cmd) + "\n", end="")
+
+def print_failure(output: str):
+	print("=" * 80)
+	print("FAILED")
+	print("=" * 80)
+	print(output)
+
+def exec(cmd: typing.List[str], what: str) -> str:
+	print_exec_line(cmd, what)
+	start = time.perf_counter()
+	process = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+	[output, cpu] = wait_with_cpu_time(process)
+	trace_event(what, "exec", start, cpu)
+	if process.returncode != 0:
+		print_failure(output.decode())
 		exit(1)
 
-def exec_vcvars(cmd: typing.List[str], what):
-	max_what_len = 40
-	if len(what) > max_what_len:
-		what = what[:max_what_len - 2] + ".."
-	print(what + (" " * (max_what_len - len(what))) + "> " + " ".join(cmd))
-	assertx(subprocess.run(f"vcvarsall.bat x64 && {' '.join(cmd)}", shell=True).returncode == 0, f"Failed to run command '{cmd}'")
+def vcvars_command(cmd: typing.List[str]) -> str:
+	return f"vcvarsall.bat x64 && {' '.join(cmd)}"
 
-def copy(from_path: str, files: typing.List[str], to_path: str):
-	for file in files:
-		shutil.copy(path.join(from_path, file), to_path)
+def object_for_source(source: str) -> str:
+	""" Returns the object file the compiler produces for a source file """
+	object_ext = ".obj" if platform_win32_like else ".o"
+	return path.splitext(source)[0] + object_ext
+
+def compile_command(source: str, compile_flags: typing.List[str]) -> typing.List[str]:
+	if platform_win32_like:  return ["cl"] + compile_flags + ["/c", source, "/Fo" + object_for_source(source)]
+	elif platform_unix_like: return ["clang"] + compile_flags + ["-c", source, "-o", object_for_source(source)]
+
+def run_compiler(cmd: typing.List[str], stdout = subprocess.PIPE, stderr = subprocess.STDOUT, cwd: str = None) -> subprocess.Popen:
+	# cl.exe, *in particular*, won't work without running vcvarsall first, even if cl.exe is in the path.
+	# See did_re_execute
+	if platform_win32_like: return subprocess.Popen(vcvars_command(cmd), shell=True, stdout=stdout, stderr=stderr, cwd=cwd)
+	else:                   return subprocess.Popen(cmd, stdout=stdout, stderr=stderr, cwd=cwd)
+
+def get_compiler_version() -> str:
+	""" Returns the compiler's version banner, which is part of every object cache key """
+	if platform_win32_like:  cmd = ["cl"]
+	elif platform_unix_like: cmd = ["clang", "--version"]
+	return run_compiler(cmd).communicate()[0].decode(errors="replace").strip()
+
+def preprocess_command(source: str, compile_flags: typing.List[str]) -> typing.List[str]:
+	if platform_win32_like:  return ["cl"] + compile_flags + ["/E", source]
+	elif platform_unix_like: return ["clang"] + compile_flags + ["-E", source]
+
+def object_cache_key(source: str, compile_flags: typing.List[str], compiler_version: str, extra_inputs: typing.List[str] = [], work_dir: str = None) -> str:
+	""" Hashes the preprocessed source, flags, compiler version and `extra_inputs` (eg. the hash of a
+	PGO profile, whose content isn't captured by the flags). Returns None if the source can't be
+	preprocessed, in which case it should just be compiled to get the diagnostics. """
+	process = run_compiler(preprocess_command(source, compile_flags), stderr=subprocess.DEVNULL, cwd=work_dir)
+	preprocessed = process.communicate()[0]
+	if process.returncode != 0: return None
+
+	key = hashlib.sha256()
+	for part in [compiler_version, "\0".join(compile_flags), source] + extra_inputs:
+		key.update(part.encode())
+		key.update(b"\0")
+	key.update(preprocessed)
+	return key.hexdigest()
+
+def object_cache_path(key: str, object_file: str, cache_dir: str = object_cache_dir) -> str:
+	return path.join(cache_dir, key[:2], key + path.splitext(object_file)[1])
+
+def link_or_copy(from_file: str, to_file: str):
+	if path.exists(to_file): os.remove(to_file)
+	try: os.link(from_file, to_file)
+	except OSError: shutil.copy2(from_file, to_file)
+
+def object_cache_store(object_file: str, cached_file: str):
+	os.makedirs(path.dirname(cached_file), exist_ok=True)
+	# Copy under a temporary name first, so an interrupted build never leaves a truncated object in the cache
+	partial_file = f"{cached_file}.{os.getpid()}.{threading.get_ident()}.partial"
+	shutil.copy2(object_file, partial_file)
+	os.replace(partial_file, cached_file)
 
-def glob_copy(root_dir: str, glob_pattern: str, dest_dir: str):
-	the_files = glob(root_dir=root_dir, pathname=glob_pattern)
-	copy(root_dir, the_files, dest_dir)
-	return the_files
+def object_cache_evict(max_bytes: int, cache_dir: str = object_cache_dir):
+	""" Removes least recently used objects until the cache fits in `max_bytes`. Cache hits touch
+	the mtime of the cached object, so the oldest mtime is the least recently used. """
+	entries = []
+	total_bytes = 0
+	# Only the two character key prefix folders, as the object caches of targets are in folders next to them
+	for cached_file in glob(path.join(cache_dir, "??", "*")):
+		stat = os.stat(cached_file)
+		entries.append([stat.st_mtime, stat.st_size, cached_file])
+		total_bytes += stat.st_size
+
+	entries.sort()
+	evicted = 0
+	for [_mtime, size, cached_file] in entries:
+		if total_bytes <= max_bytes: break
+		os.remove(cached_file)
+		total_bytes -= size
+		evicted += 1
+
+	return evicted
+
+def compile_sources(sources: typing.List[str], compile_flags: typing.List[str], jobs: int, use_cache: bool = True, compiler_version: str = None, extra_cache_inputs: typing.List[str] = [],
+                    work_dir: str = "temp", cache_dir: str = object_cache_dir, slots: threading.Semaphore = None, label: str = None):
+	""" Compiles every source in its own compiler process, running at most `jobs` at once.
+	Output is printed per file as it finishes. On the first failure, all other compiles
+	are stopped and the diagnostics for the failing file are printed.
+	Sources are relative to `work_dir`, which the compiler runs in. Objects are looked up in, and added to, the object cache in `cache_dir`.
+	If `slots` is given, it's held while compiling, so builds running side by side share a number of compiler processes.
+	`label` is shown with each source, to tell such builds apart.
+	Returns a dict with the number of cache hits and misses, and the cached file for each object. """
+	print_lock = threading.Lock()
+	running = set()
+	failed = threading.Event()
+	stats = { "hits": 0, "misses": 0, "cached_objects": {} }
+	if use_cache and compiler_version == None: compiler_version = get_compiler_version()
+
+	name = lambda source: source if label == None else f"{source} ({label})"
+
+	def compile_one(source: str):
+		with slots or contextlib.nullcontext(): compile_one_in_slot(source)
+
+	def compile_one_in_slot(source: str):
+		if failed.is_set(): return
+
+		start = time.perf_counter()
+		object_file = object_for_source(source)
+
+		cached_file = None
+		if use_cache:
+			key = object_cache_key(source, compile_flags, compiler_version, extra_cache_inputs, work_dir)
+			if key != None: cached_file = object_cache_path(key, object_file, cache_dir)
+
+		if cached_file != None and path.isfile(cached_file):
+			link_or_copy(cached_file, path.join(work_dir, object_file))
+			os.utime(cached_file)
+			with print_lock:
+				stats["hits"] += 1
+				stats["cached_objects"][object_file] = cached_file
+				print_exec_line([cached_file], f"Cached {name(source)}")
+			trace_event(name(source), "compile", start, None, result="cached")
+			return
+
+		cmd = compile_command(source, compile_flags)
+		process = run_compiler(cmd, cwd=work_dir)
+
+		with print_lock:
+			running.add(process)
+			if failed.is_set(): process.kill()
+		[output, cpu] = wait_with_cpu_time(process)
+		output = output.decode(errors="replace")
+		with print_lock:
+			running.discard(process)
+			if failed.is_set(): return
+
+			if process.returncode != 0:
+				failed.set()
+				for other in running: other.kill()
+				print_exec_line(cmd, f"Compiling {name(source)}")
+				print_failure(output)
+				return
+
+		if cached_file != None: object_cache_store(path.join(work_dir, object_file), cached_file)
+		trace_event(name(source), "compile", start, cpu, result="compiled")
+
+		with print_lock:
+			if use_cache: stats["misses"] += 1
+			if cached_file != None: stats["cached_objects"][object_file] = cached_file
+			print_exec_line(cmd, f"Compiled {name(source)} ({time.perf_counter() - start:.1f}s)")
+			if output.strip() != "": print(output.rstrip())
+
+	with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+		for future in as_completed([executor.submit(compile_one, source) for source in sources]):
+			future.result()
+			if failed.is_set():
+				executor.shutdown(cancel_futures=True)
+				break
+
+	if failed.is_set(): exit(1)
+
+	return stats
+
+def make_unity_sources(sources: typing.List[str], shards: int, source_dir: str) -> typing.List[str]:
+	""" Writes `shards` amalgamated translation units to `source_dir`, each including a share of `sources`.
+	Sources are spread by size, so that the shards take about as long to compile.
+	Objective-C++ sources can't be mixed with C++ ones, so they're left as they are.
+	Returns the sources to compile instead. """
+	cpp_sources = [source for source in sources if source.endswith(".cpp")]
+	other_sources = [source for source in sources if not source.endswith(".cpp")]
+	shards = min(shards, len(cpp_sources))
+
+	shard_sources = [[] for _ in range(shards)]
+	shard_sizes = [0] * shards
+	for source in sorted(cpp_sources, key=lambda source: path.getsize(path.join(source_dir, source)), reverse=True):
+		smallest_shard = shard_sizes.index(min(shard_sizes))
+		shard_sources[smallest_shard].append(source)
+		shard_sizes[smallest_shard] += path.getsize(path.join(source_dir, source))
+
+	unity_sources = []
+	for shard_idx in range(shards):
+		unity_source = f"unity_{shard_idx}.cpp"
+		with open(path.join(source_dir, unity_source), "w") as f:
+			f.write("// Generated by build.py. Unity build of the following sources:\n")
+			# imgui's own sources define this before including imgui.h, which only works for the first one to include it
+			f.write("#define IMGUI_DEFINE_MATH_OPERATORS\n")
+			# Keep the original order within a shard, so eg. imgui.cpp is always included first
+			for source in sorted(shard_sources[shard_idx], key=sources.index):
+				f.write(f'#include "{source}"\n')
+		unity_sources.append(unity_source)
+
+	return unity_sources + other_sources
 
 def platform_select(the_options):
 	""" Given a dict like eg. { "windows": "/DCOOL_DEFINE", "linux, darwin": "-DCOOL_DEFINE" }
@@ -128,14 +501,139 @@ def has_tool(tool: str) -> bool:
 	except: return True
 	else: return True
 
+def try_exec(cmd: typing.List[str], what: str) -> bool:
+	""" Like exec, but returns whether the command succeeded instead of exiting """
+	print_exec_line(cmd, what)
+	return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+def looks_like_hash(commit: str) -> bool:
+	return len(commit) >= 7 and all(char in "0123456789abcdefABCDEF" for char in commit)
+
+def git_resolve(dir: str, commit: str) -> str:
+	""" Returns the full hash of a commit, tag or branch, or None if it isn't available locally """
+	result = subprocess.run(["git", "-C", dir, "rev-parse", "--verify", "--quiet", commit + "^{commit}"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+	if result.returncode != 0: return None
+	return result.stdout.decode().strip()
+
+def resolve_repo(repo: str, mirror_dir: str) -> str:
+	""" Returns where to fetch `repo` from. With a mirror dir, that's the local
+	`<mirror_dir>/<repo name>` (or `<repo name>.git`), and nothing is fetched from the network. """
+	if mirror_dir == None: return repo
+
+	name = path.basename(repo.rstrip("/")).removesuffix(".git")
+	for candidate in [name + ".git", name]:
+		mirror = path.join(mirror_dir, candidate)
+		if path.isdir(mirror): return path.abspath(mirror)
+
+	assertx(False, f"No mirror of '{repo}' in '{mirror_dir}' (expected '{name}' or '{name}.git')")
+
 def ensure_checked_out_with_commit(dir: str, repo: str, wanted_commit: str):
-	if not path.exists(dir):
-		exec(["git", "clone", repo, dir], f"Cloning {dir}")
+	""" Makes sure `dir` is checked out at `wanted_commit`. Does nothing if it already is.
+	Otherwise only the wanted commit is fetched, shallow and blobless. That isn't possible for
+	abbreviated hashes, as servers only accept full hashes, so those fall back to fetching
+	the (blobless) history. """
+	if path.isdir(dir):
+		head = git_head(dir)
+		if looks_like_hash(wanted_commit) and hashes_are_same_ish(head, wanted_commit): return
+		resolved = git_resolve(dir, wanted_commit)
+		if resolved == head: return
+		# The remote may have moved, eg. when switching to a mirror
+		if resolved == None: exec(["git", "-C", dir, "remote", "set-url", "origin", repo], f"Setting remote for {dir}")
+	else:
+		exec(["git", "init", "--quiet", dir], f"Initializing {dir}")
+		exec(["git", "-C", dir, "remote", "add", "origin", repo], f"Adding remote for {dir}")
+		resolved = None
+
+	if resolved == None:
+		# Named refs are fetched into a local tag, so the fast path above can resolve them next time
+		refspec = wanted_commit if looks_like_hash(wanted_commit) else f"+{wanted_commit}:refs/tags/{wanted_commit}"
+		fetched = try_exec(["git", "-C", dir, "fetch", "--quiet", "--depth", "1", "--filter=blob:none", "origin", refspec], f"Fetching {dir}")
+
+		if not fetched:
+			is_shallow = subprocess.check_output(["git", "-C", dir, "rev-parse", "--is-shallow-repository"]).decode().strip() == "true"
+			unshallow = ["--unshallow"] if is_shallow else []
+			exec(["git", "-C", dir, "fetch", "--quiet", "--filter=blob:none", "--tags"] + unshallow + ["origin"], f"Fetching history of {dir}")
+
+	exec(["git", "-c", "advice.detachedHead=false", "-C", dir, "checkout", "--quiet", wanted_commit], f"Checking out {dir}")
+
+def ensure_all_checked_out(checkouts: typing.List[typing.List[str]], mirror_dir: str, jobs: int):
+	""" Runs ensure_checked_out_with_commit for a list of [dir, repo, commit], fetching in parallel """
+	with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(checkouts)))) as executor:
+		futures = [executor.submit(ensure_checked_out_with_commit, dir, resolve_repo(repo, mirror_dir), commit) for [dir, repo, commit] in checkouts]
+		for future in futures: future.result()
+
+def git_head(dir: str) -> str:
+	return subprocess.check_output(["git", "-C", dir, "rev-parse", "HEAD"]).decode().strip()
+
+def hash_file(file: str) -> str:
+	with open(file, "rb") as f:
+		return hashlib.sha256(f.read()).hexdigest()
+
+def hash_inputs(inputs: typing.List[str]) -> str:
+	""" Hashes a list of strings into a single stage input hash """
+	digest = hashlib.sha256()
+	for input in inputs:
+		digest.update(input.encode())
+		digest.update(b"\0")
+	return digest.hexdigest()
+
+def write_if_changed(file: str, content: str) -> bool:
+	""" Writes file, unless it already has exactly this content. Returns whether it was written. """
+	if path.isfile(file):
+		with open(file, "r", newline="") as f:
+			if f.read() == content: return False
+
+	with open(file, "w", newline="") as f:
+		f.write(content)
+	return True
+
+def load_manifest() -> dict:
+	if not path.isfile(manifest_path): return {}
+	try:
+		with open(manifest_path, "r") as f: return json.load(f)
+	except ValueError:
+		return {}
+
+# Targets are built side by side, and record their stages as they go
+manifest_lock = threading.Lock()
+
+def save_manifest(manifest: dict):
+	os.makedirs(path.dirname(manifest_path), exist_ok=True)
+	with open(manifest_path, "w") as f:
+		json.dump(manifest, f, indent="\t")
+
+def stage_is_up_to_date(manifest: dict, stage: str, inputs: str) -> bool:
+	""" A stage is up to date if it was last run with the same inputs, and its outputs
+	are still there, untouched. """
+	entry = manifest.get(stage)
+	if entry == None or entry["inputs"] != inputs: return False
+
+	for [output, digest] in entry["outputs"].items():
+		if not path.isfile(output) or hash_file(output) != digest: return False
+
+	return True
+
+def record_stage(manifest: dict, stage: str, inputs: str, outputs: typing.List[str], **extra):
+	entry = { "inputs": inputs, "outputs": { output: hash_file(output) for output in outputs }, **extra }
+	with manifest_lock:
+		manifest[stage] = entry
+		save_manifest(manifest)
+
+def print_skipped_stage(what: str):
+	print_exec_line(["up to date"], what)
+
+def get_platform_imgui_lib_name(suffix: str = "", target: str = None) -> str:
+	""" Returns imgui binary name for system/processor. `suffix` is appended to the name, before the extension. """
+	return get_platform_lib_name("imgui", suffix, target)
 
-	exec(["git", "-c", "advice.detachedHead=false", "-C", dir, "checkout", wanted_commit], f"Checking out {dir}")
+def get_platform_backend_lib_name(backend_name: str, suffix: str = "", target: str = None) -> str:
+	""" Returns the binary name of a backend for system/processor, eg. `imgui_impl_vulkan_linux_x64.a` """
+	return get_platform_lib_name(f"imgui_impl_{backend_name}", suffix, target)
 
-def get_platform_imgui_lib_name() -> str:
-	""" Returns imgui binary name for system/processor """
+def get_platform_lib_name(name: str, suffix: str = "", target: str = None) -> str:
+	""" Names the binary for `target`, a key into build_targets, or for the host if None """
+	if target != None:
+		return f'{name}_{build_targets[target]["system"].lower()}_{build_targets[target]["arch"]}{suffix}.a'
 
 	system = platform.system()
 
@@ -148,23 +646,443 @@ def get_platform_imgui_lib_name() -> str:
 	assertx(system != "", "System could not be determined")
 	assertx(processor != None, f"Unexpected processor: {platform.machine()}")
 
-	return f'imgui_{system.lower()}_{processor}.{binary_ext}'
+	return f'{name}_{system.lower()}_{processor}{suffix}.{binary_ext}'
+
+def archive_command(dest_binary: str, objects: typing.List[str], lto: bool, target: str = None) -> typing.List[str]:
+	if platform_win32_like: return ["lib"] + (["/LTCG"] if lto else []) + ["/OUT:" + dest_binary] + objects
+	# GNU ar can't index LLVM bitcode objects, or usually objects for other architectures,
+	# which leaves linkers unable to find symbols in the archive
+	if (lto or target != None) and platform.system() == "Linux": return ["llvm-ar", "rcs", dest_binary] + objects
+	return ["ar", "rcs", dest_binary] + objects
+
+def target_compile_flags(target: str) -> typing.List[str]:
+	""" Flags which make clang compile for `target`, a key into build_targets. None for the host. """
+	if target == None: return []
+	flags = ["--target=" + build_targets[target]["triple"]]
+	if build_targets[target]["sysroot"] != None: flags += ["--sysroot=" + build_targets[target]["sysroot"]]
+	return flags
+
+def get_odin_platform() -> typing.List[str]:
+	""" Returns [ODIN_OS, ODIN_ARCH] of the machine building """
+	arch = None
+	if platform.machine() in ["AMD64", "x86_64"]:  arch = "amd64"
+	if platform.machine() in ["arm64", "aarch64"]: arch = "arm64"
+	assertx(arch != None, f"Unexpected processor: {platform.machine()}")
+	return [platform.system(), arch]
+
+def measure_struct_layout(bindings_json: str, layout_path: str):
+	""" Builds and runs the layout probe written by gen_odin.py, and writes what it measured to `layout_path`, for gen_odin.py --layout """
+	os.makedirs(layout_dir, exist_ok=True)
+	probe_source = path.join(layout_dir, "layout_probe.c")
+	probe_binary = path.join(layout_dir, "layout_probe" + (".exe" if platform_win32_like else ""))
+
+	exec([sys.executable, pp("gen_odin.py"), bindings_json, "imgui.odin", "--layout-probe", probe_source], "Writing layout probe")
+	if platform_win32_like: exec(["cl", "/nologo", "/I" + bindings_dir, "/I" + pp("imgui"), probe_source, "/Fe" + probe_binary, "/Fo" + path.join(layout_dir, "layout_probe.obj")], "Compiling layout probe")
+	else:                   exec(["clang", "-I", bindings_dir, "-I", pp("imgui"), probe_source, "-o", probe_binary], "Compiling layout probe")
+
+	print_exec_line([probe_binary], "Measuring struct layout")
+	probe = subprocess.run([path.abspath(probe_binary)], stdout=subprocess.PIPE, text=True)
+	assertx(probe.returncode == 0, "Layout probe failed!")
+
+	[odin_os, odin_arch] = get_odin_platform()
+	structs = {}
+	for line in probe.stdout.splitlines():
+		parts = line.split()
+		if parts[0] == "struct": structs[parts[1]] = { "size": int(parts[2]), "offsets": {} }
+		else:                    structs[parts[1]]["offsets"][parts[2]] = int(parts[3])
+
+	write_if_changed(layout_path, json.dumps({ "os": odin_os, "arch": odin_arch, "structs": structs }, indent="\t") + "\n")
+
+def backend_is_enabled(backend_name: str) -> bool:
+	""" Whether a backend in wanted_backends is built on this platform """
+	backend = backends[backend_name]
+	return not "enabled_on" in backend or platform.system().lower() in backend["enabled_on"]
+
+def backend_package_file(backend_name: str) -> str:
+	return path.join(f"imgui_impl_{backend_name}", f"imgui_impl_{backend_name}.odin")
+
+def files_differing_from_git(files: typing.List[str]) -> typing.List[str]:
+	""" Returns which of `files` are changed, or not committed at all. None if this isn't a git checkout. """
+	status = subprocess.run(["git", "status", "--porcelain", "--"] + files, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+	if status.returncode != 0: return None
+	return [line[3:] for line in status.stdout.decode().splitlines()]
+
+def generate_backend_bindings(backend_names: typing.List[str], manifest: dict, jobs: int):
+	""" Generates the imgui_impl_* package of each backend: dear_bindings parses the backend's header, and gen_odin.py --backend
+	writes the package. Backends run in parallel, and are skipped if imgui, dear_bindings and gen_odin.py haven't changed. """
+	inputs = hash_inputs([git_head("imgui"), git_head("dear_bindings"), hash_file("gen_odin.py")])
+	stale = [backend_name for backend_name in backend_names if not stage_is_up_to_date(manifest, f"backend:{backend_name}", inputs)]
+	for backend_name in backend_names:
+		if not backend_name in stale: print_skipped_stage(f"Generating imgui_impl_{backend_name}")
+
+	if len(stale) == 0: return
+
+	def generate(backend_name: str) -> typing.List[str]:
+		bindings_base = path.join(bindings_dir, f"c_imgui_impl_{backend_name}")
+		exec([sys.executable, pp("dear_bindings/dear_bindings.py"), "--backend", "--imgui-include-dir", pp("imgui/"), "-o", bindings_base, pp(f"imgui/backends/imgui_impl_{backend_name}.h")], f"Running dear_bindings (imgui_impl_{backend_name})")
+
+		odin_file = backend_package_file(backend_name)
+		os.makedirs(path.dirname(odin_file), exist_ok=True)
+		exec([sys.executable, pp("gen_odin.py"), bindings_base + ".json", odin_file, "--backend", backend_name], f"Generating imgui_impl_{backend_name}")
+		return [bindings_base + ".json", odin_file]
+
+	os.makedirs(bindings_dir, exist_ok=True)
+	with traced_stage("Generating backend bindings"):
+		with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(stale)))) as executor:
+			futures = [[backend_name, executor.submit(generate, backend_name)] for backend_name in stale]
+			# The manifest is only touched from this thread
+			for [backend_name, future] in futures: record_stage(manifest, f"backend:{backend_name}", inputs, future.result())
+
+def get_bindings_files() -> typing.List[str]:
+	""" Returns the generated binding files, imgui.odin and, if split_bindings, eg. imgui_enums.odin """
+	return sorted(glob("imgui*.odin"))
+
+def find_imgui_bindings(bindings_files: typing.List[str]) -> typing.Dict[str, str]:
+	""" Returns the foreign procs in `bindings_files`, as a dict of Odin name to link name """
+	bindings = {}
+	for bindings_file in bindings_files:
+		with open(bindings_file, "r") as file:
+			bindings.update((name, link_name) for [link_name, name] in re.findall(r'@\(link_name="(\w+)"[^)]*\)\s+(\w+)\s*::\s*proc', file.read()))
+	return bindings
+
+def find_used_bindings(project_dir: str, bindings_files: typing.List[str]) -> typing.List[str]:
+	""" Scans the Odin files in `project_dir` for references to procs in the imgui package,
+	and returns the link names of the foreign procs they use, directly or through procs written in Odin (eg. CHECKVERSION). """
+	bindings = find_imgui_bindings(bindings_files)
+	used_names = set()
+
+	# What each of the bindings' own procs, outside of the foreign block, calls
+	odin_proc_calls = {}
+	for bindings_file in bindings_files:
+		with open(bindings_file, "r") as file:
+			current_proc = None
+			for line in file:
+				line = line.split("//")[0]
+				# Proc groups use each of their members
+				group_match = re.match(r"(\w+)\s*::\s*proc\s*\{([\w\s,]*)\}\s*$", line)
+				if current_proc == None and group_match != None:
+					odin_proc_calls[group_match.group(1)] = set(member.strip() for member in group_match.group(2).split(","))
+					continue
+				proc_match = re.match(r"(\w+)\s*::.*\bproc\b.*\{\s*$", line)
+				if current_proc == None and proc_match != None and not line.startswith("foreign"):
+					current_proc = proc_match.group(1)
+					odin_proc_calls[current_proc] = set()
+				elif line.startswith("}"):
+					current_proc = None
+				elif current_proc != None:
+					odin_proc_calls[current_proc].update(re.findall(r"\b(\w+)\(", line))
+
+	package_dir = path.abspath(".")
+	for odin_file in sorted(glob(path.join(project_dir, "**", "*.odin"), recursive=True)):
+		with open(odin_file, "r", encoding="utf-8", errors="replace") as file: source = file.read()
+
+		# Find what the imgui package is imported as. Paths in collections (eg. `shared:imgui`) can't be resolved, so go by name.
+		aliases = []
+		for [alias, import_path] in re.findall(r'^\s*import\s+(?:(\w+)\s+)?"([^"]+)"', source, re.MULTILINE):
+			import_name = path.basename(path.normpath(import_path.split(":")[-1]))
+			if ":" in import_path:
+				is_imgui = import_name.find("imgui") != -1 and not import_name.startswith("imgui_impl")
+			else:
+				is_imgui = path.abspath(path.join(path.dirname(odin_file), import_path)) == package_dir
+			if is_imgui: aliases.append(alias if alias != "" else "imgui")
+
+		for alias in aliases:
+			used_names.update(re.findall(rf"\b{alias}\.(\w+)", source))
+
+	unvisited = list(used_names)
+	while len(unvisited) > 0:
+		for called in odin_proc_calls.get(unvisited.pop(), []):
+			if not called in used_names:
+				used_names.add(called)
+				unvisited.append(called)
+
+	return sorted(bindings[name] for name in used_names if name in bindings)
+
+def undefined_symbols(objects: typing.List[str]) -> typing.List[str]:
+	""" Returns the symbols `objects` reference, but don't define """
+	output = subprocess.run(["nm", "--undefined-only", "--format=posix"] + objects, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+	return sorted(set(line.split()[0] for line in output.splitlines() if len(line.split()) >= 2 and line.split()[1] == "U"))
+
+def strip_unused_objects(objects: typing.List[str], keep_symbols: typing.List[str], dest_object: str):
+	""" Partially links `objects` into `dest_object`, dropping every section not reachable from `keep_symbols`.
+	The objects must have been compiled with -ffunction-sections -fdata-sections, so that each function can be dropped on its own. """
+	exec(["ld", "-r", "--gc-sections", "-o", dest_object] + [f"--undefined={symbol}" for symbol in keep_symbols] + objects, f"Stripping {path.basename(dest_object)}")
+
+def write_strip_report(report_path: str, project_dir: str, used_bindings: typing.List[str], total_bindings: int, full_size: int, stripped_size: int):
+	""" `full_size` is None if the archive wasn't stripped """
+	lines = [
+		f"Project: {project_dir}",
+		f"Kept {len(used_bindings)} of {total_bindings} bindings",
+	]
+	if full_size != None:
+		saved = full_size - stripped_size
+		lines += [f"Core archive: {format_bytes(full_size)} -> {format_bytes(stripped_size)} (saved {format_bytes(saved)}, {100 * saved / max(full_size, 1):.1f}%)"]
+	else:
+		lines += ["Core archive: not stripped on this platform, unused functions are dropped by the linker instead (/OPT:REF, -dead_strip)"]
+
+	with open(report_path, "w") as file:
+		file.write("\n".join(lines + ["", "Kept bindings:"] + [f"  {binding}" for binding in used_bindings]) + "\n")
+
+	for line in lines[1:]: print(line)
+	print(f"Strip report written to {report_path}")
+
+def format_bytes(size: int) -> str:
+	if size >= 1024 * 1024: return f"{size / (1024 * 1024):.2f} MiB"
+	return f"{size / 1024:.1f} KiB"
+
+def build_libraries(stage: str, archives: typing.List[typing.List], temp_files: typing.List[str], compile_flags: typing.List[str],
+                    compile_inputs: str, compiler_version: str, lto: bool, args, manifest: dict, extra_cache_inputs: typing.List[str] = [],
+                    keep_symbols: typing.List[str] = None, target: str = None, slots: threading.Semaphore = None):
+	""" Compiles the sources of each archive in `archives`, a list of [dest_binary, sources], in `temp`, and archives them.
+	The first archive is the imgui core, the rest are backends. Everything is compiled in one go, but each archive
+	is only rewritten if the objects in it changed, so eg. enabling a backend only touches that backend's archive.
+	`stage` names the manifest entries, so that each profile is tracked separately.
+	If `keep_symbols` is given, the core archive is stripped down to what those symbols, and the backends, need.
+	A `target` (key into build_targets) is compiled in its own folder in `temp`, with its own object cache, so several can build at once.
+	Returns the object cache stats, or None if nothing was compiled. """
+	work_dir = "temp" if target == None else path.join("temp", target)
+	cache_dir = object_cache_dir if target == None else path.join(object_cache_dir, target)
+
+	dest_binaries = [dest_binary for [dest_binary, _sources] in archives]
+	libraries_inputs = hash_inputs([compile_inputs, f"lto:{lto}"] + dest_binaries + (keep_symbols or []))
+	if stage_is_up_to_date(manifest, f"libraries:{stage}", libraries_inputs):
+		print_skipped_stage(f"Compiling sources ({stage})")
+		print_skipped_stage(f"Making libraries ({stage})")
+		return None
+
+	# Clear the temp folder, and copy sources to it
+	shutil.rmtree(path=work_dir, ignore_errors=True)
+	os.makedirs(work_dir)
+	for file in temp_files: shutil.copy(file, work_dir)
+
+	# Unity builds only make sense for the core, backends are a single source each
+	archives = [list(archive) for archive in archives]
+	if args.unity > 0: archives[0][1] = make_unity_sources(archives[0][1], args.unity, work_dir)
+	all_sources = [source for [_dest_binary, sources] in archives for source in sources]
+
+	cache_stats = None
+	if not args.no_cache and stage_is_up_to_date(manifest, f"compile:{stage}", compile_inputs):
+		print_skipped_stage(f"Compiling sources ({stage})")
+		for [object_file, cached_file] in manifest[f"compile:{stage}"]["cached_objects"].items():
+			link_or_copy(cached_file, path.join(work_dir, object_file))
+	else:
+		with traced_stage(f"Compiling ({stage})"):
+			cache_stats = compile_sources(all_sources, compile_flags, args.jobs, use_cache=not args.no_cache, compiler_version=compiler_version, extra_cache_inputs=extra_cache_inputs,
+			                              work_dir=work_dir, cache_dir=cache_dir, slots=slots, label=target)
+
+		if not args.no_cache:
+			record_stage(manifest, f"compile:{stage}", compile_inputs, list(cache_stats["cached_objects"].values()), cached_objects=cache_stats["cached_objects"])
+			cache_stats["evicted"] = object_cache_evict(object_cache_max_bytes, cache_dir)
+
+	with traced_stage(f"Archiving ({stage})"):
+		backend_objects = map_to_folder([object_for_source(source) for [_dest_binary, sources] in archives[1:] for source in sources], work_dir)
+		for [index, [dest_binary, sources]] in enumerate(archives):
+			objects = map_to_folder(list(map(object_for_source, sources)), work_dir)
+			strip = index == 0 and keep_symbols != None
+			archive_inputs = hash_inputs([dest_binary, f"lto:{lto}"] + [hash_file(object_file) for object_file in objects] + (keep_symbols if strip else []))
+			if stage_is_up_to_date(manifest, f"archive:{stage}:{dest_binary}", archive_inputs):
+				print_skipped_stage(f"Making {dest_binary}")
+				continue
+
+			# ar only adds or replaces members, so start from scratch to not keep stale objects around
+			if path.isfile(dest_binary): os.remove(dest_binary)
+
+			# Only GNU/LLVM ld can partially link with garbage collection. Elsewhere, the final link drops unused sections.
+			extra = {}
+			if strip and platform.system() == "Linux":
+				unstripped_binary = path.join(work_dir, "unstripped_" + path.basename(dest_binary))
+				exec(archive_command(unstripped_binary, objects, lto), f"Making {unstripped_binary}")
+				extra["unstripped_size"] = path.getsize(unstripped_binary)
+
+				# The backends call into imgui directly, so whatever they need has to stay too
+				stripped_object = path.join(work_dir, "imgui_stripped.o")
+				strip_unused_objects(objects, keep_symbols + undefined_symbols(backend_objects), stripped_object)
+				objects = [stripped_object]
+
+			exec(archive_command(dest_binary, objects, lto, target), f"Making {dest_binary}")
+			record_stage(manifest, f"archive:{stage}:{dest_binary}", archive_inputs, [dest_binary], **extra)
+
+	record_stage(manifest, f"libraries:{stage}", libraries_inputs, dest_binaries)
+	return cache_stats
+
+def build_example_against(library: str, example: str, work_dir: str, odin_flags: typing.List[str], what: str) -> str:
+	""" Builds examples/`example` from a copy of the package in `work_dir`, where `library` takes the place of the
+	regular core archive. Returns the path of the executable. """
+	shutil.rmtree(path=work_dir, ignore_errors=True)
+	os.makedirs(path.join(work_dir, "examples", example))
+	for file in get_bindings_files(): shutil.copy(file, work_dir)
+	shutil.copy("impl_enabled.odin", work_dir)
+	shutil.copy(library, path.join(work_dir, get_platform_imgui_lib_name()))
+	shutil.copy(pp(f"examples/{example}/main.odin"), path.join(work_dir, "examples", example))
+
+	executable = path.join(work_dir, example + (".exe" if platform_win32_like else ""))
+	exec(["odin", "build", path.join(work_dir, "examples", example), "-out:" + executable, "-o:speed"] + odin_flags, what)
+	return executable
+
+def run_pgo_training(instrumented_binary: str, profile_data: str, manifest: dict):
+	""" Builds examples/null against the instrumented library, runs it `pgo_training_runs` times
+	and merges the collected profiles into `profile_data`. The example is built from a copy of
+	the package in `pgo_dir`, where the instrumented library takes the place of the regular one. """
+	training_dir = path.join(pgo_dir, "training")
+	training_inputs = hash_inputs([hash_file(instrumented_binary), hash_file(pp("examples/null/main.odin")), str(pgo_training_runs)] + [hash_file(file) for file in get_bindings_files()])
+	if stage_is_up_to_date(manifest, "pgo-training", training_inputs):
+		print_skipped_stage("Running PGO training")
+		return
+
+	training_exe = build_example_against(instrumented_binary, "null", training_dir, ["-extra-linker-flags:-fprofile-instr-generate"], "Building PGO training workload")
+	os.makedirs(path.join(training_dir, "profiles"))
+
+	env = dict(os.environ)
+	env["LLVM_PROFILE_FILE"] = path.abspath(path.join(training_dir, "profiles", "null-%p.profraw"))
+	for run in range(pgo_training_runs):
+		print_exec_line([training_exe], f"Running PGO training ({run + 1}/{pgo_training_runs})")
+		assertx(subprocess.run([training_exe], env=env, stdout=subprocess.DEVNULL).returncode == 0, "PGO training workload failed!")
+
+	exec(["llvm-profdata", "merge", "-output=" + profile_data] + glob(path.join(training_dir, "profiles", "*.profraw")), "Merging PGO profiles")
+	record_stage(manifest, "pgo-training", training_inputs, [profile_data])
+
+def run_inline_check(library: str, lto: bool, manifest: dict):
+	""" Builds examples/inline_check against `library` and runs it, which exits the build if an inlined proc doesn't match C """
+	check_inputs = hash_inputs([hash_file(library), hash_file(pp("examples/inline_check/main.odin"))] + [hash_file(file) for file in get_bindings_files()])
+	if stage_is_up_to_date(manifest, "inline-check", check_inputs):
+		print_skipped_stage("Checking inlined procs")
+		return
+
+	# LTO archives contain bitcode, which only an LTO capable linker can link
+	odin_flags = ["-linker:lld"] if lto and platform_unix_like else []
+	executable = build_example_against(library, "inline_check", inline_check_dir, odin_flags, "Building inlined proc check")
+	exec([executable], "Checking inlined procs")
+	record_stage(manifest, "inline-check", check_inputs, [executable])
+
+def run_frame_benchmark(library: str, profile_name: str, lto: bool) -> str:
+	""" Builds examples/null_benchmark against `library` and runs it. Returns the path of the results, which are
+	named after the profile and imgui commit, so runs against other profiles and imgui versions sit next to them. """
+	label = f"{profile_name}, imgui {git_heads['imgui']}"
+	results_path = path.join(frame_benchmark_dir, f"{profile_name}_{git_heads['imgui']}.json")
+	# LTO archives contain bitcode, which only an LTO capable linker can link
+	odin_flags = ["-linker:lld"] if lto and platform_unix_like else []
+	executable = build_example_against(library, "null_benchmark", path.join(frame_benchmark_dir, "build"), odin_flags, "Building frame benchmark")
+	exec([executable, f"-frames:{frame_benchmark_frames}", f"-label:{label}", "-out:" + path.abspath(results_path)], "Running frame benchmark")
+	return results_path
+
+def compare_frame_benchmarks(baseline_path: str, results_path: str):
+	""" Prints how much each scene's frame time changed since the baseline, eg. another profile or imgui version """
+	with open(baseline_path, "r") as f: baseline = json.load(f)
+	with open(results_path, "r") as f: results = json.load(f)
+
+	print(f'Frame times of "{results["label"]}" against "{baseline["label"]}":')
+	baseline_scenes = { scene["name"]: scene for scene in baseline["scenes"] }
+	for scene in results["scenes"]:
+		before = baseline_scenes.get(scene["name"])
+		if before == None: continue
+		changes = []
+		for key in ["frame_ms_p50", "frame_ms_p99"]:
+			change = 100 * (scene[key] / before[key] - 1) if before[key] > 0 else 0
+			changes.append(f'{key.removeprefix("frame_ms_")} {before[key]:8.3f}ms -> {scene[key]:8.3f}ms ({change:+6.1f}%)')
+		print(f'  {scene["name"]:<12} ' + "   ".join(changes))
+
+def watched_files() -> typing.List[str]:
+	""" What --watch rebuilds on: the generator, the build configuration, imgui and backend sources, and the backend dependencies' headers.
+	Globbed every time, so new files are noticed. Backends which aren't wanted are watched too, as wanted_backends may change. """
+	files = ["build.py", "gen_odin.py"]
+	files += glob(pp("imgui/*.h")) + glob(pp("imgui/*.cpp")) + glob(pp("imgui/backends/imgui_impl_*"))
+	for dep in backend_deps.values():
+		include_path = dep.get("include", path.join(dep["path"], "include"))
+		files += glob(path.join("backend_deps", include_path, "**", "*.h"), recursive=True)
+	return files
+
+def snapshot_mtimes(files: typing.List[str]) -> typing.Dict[str, int]:
+	mtimes = {}
+	for file in files:
+		try: mtimes[file] = os.stat(file).st_mtime_ns
+		except FileNotFoundError: pass
+	return mtimes
+
+def wait_for_changes(mtimes: typing.Dict[str, int]) -> typing.Dict[str, int]:
+	""" Returns the new mtimes, once something changed and then stayed the same for a poll, as editors can save in several writes """
+	while True:
+		time.sleep(watch_poll_seconds)
+		changed_mtimes = snapshot_mtimes(watched_files())
+		if changed_mtimes != mtimes: break
+
+	while True:
+		time.sleep(watch_poll_seconds)
+		settled_mtimes = snapshot_mtimes(watched_files())
+		if settled_mtimes == changed_mtimes: return settled_mtimes
+		changed_mtimes = settled_mtimes
+
+def watch(build_args: typing.List[str]):
+	""" Builds, then builds again whenever a watched file changes. Each build is a new build.py process, so changes to its
+	configuration apply. Stages whose inputs didn't change are skipped, and sources which didn't change come from the
+	object cache, so only the bindings, translation units and archives a change affects are redone. """
+	mtimes = snapshot_mtimes(watched_files())
+	saved_ns = None # When the change being built was saved. None for the first build.
+	while True:
+		start_ns = time.time_ns()
+		result = subprocess.run([sys.executable, "build.py"] + build_args)
+		end_ns = time.time_ns()
+
+		if result.returncode != 0: print("Build failed!")
+		elif saved_ns != None:     print(f"Library usable {(end_ns - saved_ns) / 1e9:.2f}s after saving ({(end_ns - start_ns) / 1e9:.2f}s building)")
+		print(f"Watching {len(mtimes)} files for changes..")
+
+		new_mtimes = wait_for_changes(mtimes)
+		changed = sorted(file for file in set(mtimes) | set(new_mtimes) if mtimes.get(file) != new_mtimes.get(file))
+		# Deleted files have no mtime, but were deleted after the last build started
+		saved_ns = max(new_mtimes.get(file, start_ns) for file in changed)
+		mtimes = new_mtimes
+
+		print()
+		print(f"Changed: {', '.join(changed[:5])}" + (f" and {len(changed) - 5} more" if len(changed) > 5 else ""))
 
 # TODO[TS]: This works, but there's a bug in Python, which makes cl.exe return with
 # exit code 2 for no god damn reason at all, if not run with run_vcvars.
 # If we're on windows, we can check for cl.exe, and re execute after calling vcvarsall, if available.
-def did_re_execute() -> bool:
+def did_re_execute(args) -> bool:
 	if platform.system() != "Windows": return False
 	if has_tool("cl"): return False
-	if "-no_reexecute" in sys.argv: return False
+	if args.no_reexecute: return False
 	print("Re-executing with vcvarsall..")
-	os.system("".join(["vcvarsall.bat x64 && ", sys.executable, " build.py -no_reexecute"]))
+	os.system(" ".join(["vcvarsall.bat x64 &&", sys.executable, "build.py", "-no_reexecute"] + sys.argv[1:]))
 	return True
 
+def parse_args():
+	parser = argparse.ArgumentParser()
+
+	parser.add_argument("-j", "--jobs", type=int, default=compile_jobs, help="Number of sources to compile in parallel (default: core count)")
+	parser.add_argument("--profile", default=build_profile, choices=build_profiles.keys(), help=f"Build profile (default: {build_profile})")
+	parser.add_argument("--lto", default=lto_mode, choices=["thin", "full"], help=f"LTO mode for the release-lto profile (default: {lto_mode})")
+	parser.add_argument("--unity", type=int, default=unity_shards, metavar="N", help="Amalgamate sources into N translation units before compiling (default: 0, disabled)")
+	parser.add_argument("--mirror-dir", default=git_mirror_dir, help="Fetch dependencies from local mirrors in this directory, instead of the network")
+	parser.add_argument("--trace", default=build_trace_path, help=f"Where to write the Chrome trace-event file for the build (default: {build_trace_path})")
+	parser.add_argument("--strip-unused", default=strip_unused_project, metavar="PROJECT_DIR", help="Only keep the parts of the core archive used by the Odin project in this directory")
+	parser.add_argument("--force", action="store_true", help="Run every stage, even if its inputs haven't changed since the last build")
+	parser.add_argument("--no-cache", action="store_true", help="Compile every source, without using or filling the object cache")
+	parser.add_argument("--frame-benchmark", action="store_true", help=f"After building, run examples/null_benchmark against the built library, and write the results to {frame_benchmark_dir}")
+	parser.add_argument("--frame-baseline", metavar="PATH", help="With --frame-benchmark, compare the frame times against earlier results, eg. of another profile or imgui version")
+	parser.add_argument("--targets", nargs="+", default=wanted_targets, choices=build_targets.keys(), metavar="TARGET", help=f"Build these targets side by side, instead of only the host. One or more of: {', '.join(build_targets)}")
+	parser.add_argument("--check-committed", action="store_true", help="Fail if the generated bindings (imgui.odin and the imgui_impl_* packages) differ from the committed ones, eg. in CI")
+	parser.add_argument("--watch", action="store_true", help="Stay resident, and rebuild whatever is affected when a source, header, gen_odin.py or build.py changes")
+	parser.add_argument("-no_reexecute", action="store_true", help=argparse.SUPPRESS)
+
+	return parser.parse_args()
+
 def main():
 	assertx(path.isfile("build.py"), "You have to run the script from within the repository for now!")
 
-	if did_re_execute(): return
+	args = parse_args()
+	assertx(args.jobs >= 1, "-j must be at least 1")
+	assertx(args.unity >= 0, "--unity must not be negative")
+
+	if did_re_execute(args): return
+
+	if args.watch:
+		try: watch([arg for arg in sys.argv[1:] if arg != "--watch"])
+		except KeyboardInterrupt: print("Stopped watching")
+		return
+
+	# Written even if the build fails, so it's there to look at in CI
+	atexit.register(write_build_trace, args.trace)
 
 	# Check that CLI tools are available
 	assertx(has_tool("git"), "Git not available!")
@@ -177,9 +1095,40 @@ def main():
 		assertx(has_tool("clang"), "clang not found!")
 		assertx(has_tool("ar"), "ar not found!")
 
+	if build_profiles[args.profile].get("lto", False) and platform.system() == "Linux":
+		assertx(has_tool("llvm-ar"), "llvm-ar not found! It is needed to archive LTO objects.")
+
+	if args.strip_unused != None:
+		assertx(path.isdir(args.strip_unused), f"--strip-unused: '{args.strip_unused}' is not a directory")
+		assertx(not build_profiles[args.profile].get("lto", False), "--strip-unused can't be combined with LTO, as ld can't strip bitcode objects")
+		if platform.system() == "Linux": assertx(has_tool("ld") and has_tool("nm"), "ld or nm not found! They are needed to strip the core archive.")
+
+	if args.frame_benchmark:
+		assertx(has_tool("odin"), "odin not found! It is needed to build the frame benchmark.")
+	if args.frame_baseline != None:
+		assertx(args.frame_benchmark, "--frame-baseline needs --frame-benchmark")
+		assertx(path.isfile(args.frame_baseline), f"--frame-baseline: '{args.frame_baseline}' doesn't exist")
+
+	for target in args.targets:
+		assertx(platform_unix_like, "--targets is only supported with clang")
+		assertx(build_targets[target]["system"] == platform.system(), f"Can't build target {target} on {platform.system()}, only targets for the system building")
+	if len(args.targets) > 0:
+		# These run what was built, or use tools which only understand the host's objects
+		assertx(not build_profiles[args.profile].get("pgo", False), "The PGO profile can't be combined with --targets")
+		assertx(args.strip_unused == None, "--strip-unused can't be combined with --targets")
+		assertx(not args.frame_benchmark, "--frame-benchmark can't be combined with --targets")
+		if platform.system() == "Linux": assertx(has_tool("llvm-ar"), "llvm-ar not found! It is needed to archive objects of other targets.")
+
+	if build_profiles[args.profile].get("pgo", False):
+		assertx(platform_unix_like, "The PGO profile is only supported with clang")
+		assertx(has_tool("odin"), "odin not found! It is needed to build the PGO training workload.")
+		assertx(has_tool("llvm-profdata"), "llvm-profdata not found! It is needed to merge PGO profiles.")
+
 	# Check out bindings generator tools
-	ensure_checked_out_with_commit("imgui", "https://github.com/ocornut/imgui.git", git_heads["imgui"])
-	ensure_checked_out_with_commit("dear_bindings", "https://github.com/dearimgui/dear_bindings.git", git_heads["dear_bindings"])
+	checkouts = [
+		["imgui", "https://github.com/ocornut/imgui.git", git_heads["imgui"]],
+		["dear_bindings", "https://github.com/dearimgui/dear_bindings.git", git_heads["dear_bindings"]],
+	]
 
 	# Check out backend dependencies
 	if not path.isdir("backend_deps"): os.mkdir("backend_deps")
@@ -190,40 +1139,81 @@ def main():
 		for dep in backend.get("deps", []):
 			backend_deps_names.add(dep)
 
-	for backend_dep in backend_deps_names:
+	for backend_dep in sorted(backend_deps_names):
 		full_dep = backend_deps[backend_dep]
-		ensure_checked_out_with_commit(path.join("backend_deps", full_dep["path"]), full_dep["repo"], full_dep["commit"])
+		checkouts.append([path.join("backend_deps", full_dep["path"]), full_dep["repo"], full_dep["commit"]])
 
-	# Clear the temp folder
-	shutil.rmtree(path="temp", ignore_errors=True)
-	os.mkdir("temp")
+	with traced_stage("Checking out dependencies"):
+		ensure_all_checked_out(checkouts, args.mirror_dir, args.jobs)
+
+	manifest = {} if args.force else load_manifest()
 
 	# Generate bindings for active ImGui commit
-	exec([sys.executable, pp("dear_bindings/dear_bindings.py"), "-o", pp("temp/c_imgui"), pp("imgui/imgui.h")], "Running dear_bindings")
+	bindings_json = path.join(bindings_dir, "c_imgui.json")
+	bindings_inputs = hash_inputs([git_head("imgui"), git_head("dear_bindings")])
+	if stage_is_up_to_date(manifest, "bindings", bindings_inputs): print_skipped_stage("Running dear_bindings")
+	else:
+		with traced_stage("Generating C bindings"):
+			shutil.rmtree(path=bindings_dir, ignore_errors=True)
+			os.makedirs(bindings_dir)
+			exec([sys.executable, pp("dear_bindings/dear_bindings.py"), "-o", path.join(bindings_dir, "c_imgui"), pp("imgui/imgui.h")], "Running dear_bindings")
+			record_stage(manifest, "bindings", bindings_inputs, map_to_folder(["c_imgui.h", "c_imgui.cpp", "c_imgui.json"], bindings_dir))
+
 	# Generate odin bindings from dear_bindings json file
-	exec([sys.executable, pp("gen_odin.py"), path.join("temp", "c_imgui.json"), "imgui.odin"], "Running odin-imgui")
+	odin_inputs = hash_inputs([hash_file(bindings_json), hash_file("gen_odin.py"), f"split:{split_bindings}", f"layout:{verify_struct_layout}:{get_odin_platform()}"])
+	if stage_is_up_to_date(manifest, "odin", odin_inputs): print_skipped_stage("Running odin-imgui")
+	else:
+		with traced_stage("Generating Odin bindings"):
+			layout_args = []
+			if verify_struct_layout:
+				layout_path = path.join(layout_dir, "layout.json")
+				measure_struct_layout(bindings_json, layout_path)
+				layout_args = ["--layout", layout_path]
+
+			exec([sys.executable, pp("gen_odin.py"), bindings_json, "imgui.odin", "--helper-report", helper_report_path] + layout_args + (["--split-files"] if split_bindings else []), "Running odin-imgui")
+			record_stage(manifest, "odin", odin_inputs, get_bindings_files())
+
+	# Generating a backend's package doesn't need its platform, so every package can be checked on any machine
+	generated_backends = [backend_name for backend_name in wanted_backends if not backends[backend_name].get("hand_written", False)]
+	generate_backend_bindings(generated_backends, manifest, args.jobs)
 
-	# Find and copy imgui sources to temp folder
-	_imgui_headers = glob_copy("imgui", "*.h", "temp")
-	imgui_sources = glob_copy("imgui", "*.cpp", "temp")
+	# The generated bindings are committed, so that the repository can be used without building them
+	differing_files = files_differing_from_git(get_bindings_files() + [backend_package_file(backend_name) for backend_name in generated_backends])
+	if differing_files != None and len(differing_files) > 0:
+		print("These generated files differ from the committed ones, and should be committed:")
+		for file in differing_files: print(f"  {file}")
+		assertx(not args.check_committed, "--check-committed: The committed bindings are out of date!")
+
+	# Find imgui sources, and everything which needs to be copied to the temp folder to compile them
+	imgui_sources = sorted(glob(pp("imgui/*.cpp")))
+	temp_files = sorted(glob(pp("imgui/*.h"))) + imgui_sources + map_to_folder(["c_imgui.h", "c_imgui.cpp"], bindings_dir)
 
 	# Gather sources, defines, includes etc
-	all_sources = imgui_sources
-	all_sources += ["c_imgui.cpp"]
+	core_sources = list(map(path.basename, imgui_sources))
+	core_sources += ["c_imgui.cpp"]
+	backend_sources = [] # [backend name, source]
 
-	# Basic flags
+	# Basic flags. Contracting a * b + c into a fused multiply-add (clang's default on eg. arm64) changes float results,
+	# and the procs gen_odin.py writes in Odin (see _inline_function_bodies) only match C bit for bit without it.
 	compile_flags = platform_select({
-		"windows": ['/DIMGUI_IMPL_API=extern\\\"C\\\"'],
-		"linux, darwin": ['-DIMGUI_IMPL_API=extern\"C\"', "-fPIC", "-fno-exceptions", "-fno-rtti", "-fno-threadsafe-statics", "-std=c++11"],
+		"windows": ['/DIMGUI_IMPL_API=extern\\\"C\\\"', "/fp:precise"],
+		"linux, darwin": ['-DIMGUI_IMPL_API=extern\"C\"', "-fPIC", "-fno-exceptions", "-fno-rtti", "-fno-threadsafe-statics", "-std=c++11", "-ffp-contract=off"],
 	})
 
 	# Optimization flags
-	if compile_debug: compile_flags += platform_select({ "windows": ["/Od", "/Z7"], "linux, darwin": ["-g", "-O0"] })
-	else: compile_flags += platform_select({ "windows": ["/O2"], "linux, darwin": ["-O3"] })
+	profile = build_profiles[args.profile]
+	compile_flags += platform_select(profile["flags"])
+	if profile.get("lto", False) and platform_unix_like: compile_flags += [f"-flto={args.lto}"]
+
+	# Put every function and variable in its own section, so unused ones can be dropped one by one
+	used_bindings = None
+	if args.strip_unused != None:
+		compile_flags += platform_select({ "windows": ["/Gy", "/Gw"], "linux, darwin": ["-ffunction-sections", "-fdata-sections"] })
+		used_bindings = find_used_bindings(args.strip_unused, get_bindings_files())
+		assertx(len(used_bindings) > 0, f"--strip-unused: No imgui procs are used by the Odin files in '{args.strip_unused}'")
 
 	# Write file describing the enabled backends
-	f = open("impl_enabled.odin", "w+")
-	f.writelines([
+	impl_enabled = "".join([
 		"package imgui\n",
 		"\n",
 		"// This is a generated helper file which you can use to know which\n",
@@ -232,63 +1222,150 @@ def main():
 	])
 
 	for backend_name in backends:
-		f.writelines([f"BACKEND_{backend_name.upper()}_ENABLED :: {'true' if backend_name in wanted_backends else 'false'}\n"])
+		impl_enabled += f"BACKEND_{backend_name.upper()}_ENABLED :: {'true' if backend_name in wanted_backends else 'false'}\n"
+
+	write_if_changed("impl_enabled.odin", impl_enabled)
 
-	# Find and copy imgui backend sources to temp folder
+	# Find imgui backend sources
 	for backend_name in wanted_backends:
 		backend = backends[backend_name]
 
-		if "enabled_on" in backend and not platform.system().lower() in backend["enabled_on"]:
+		if not backend_is_enabled(backend_name):
 			continue
 
 		if not backend["supported"]:
 			print(f"Warning: compiling backend '{backend_name}' which is not officially supported")
 
-		glob_copy(pp("imgui/backends"), f"imgui_impl_{backend_name}.*", "temp")
+		temp_files += sorted(glob(pp(f"imgui/backends/imgui_impl_{backend_name}.*")))
 
-		if backend_name in ["osx", "metal"]: all_sources += [f"imgui_impl_{backend_name}.mm"]
-		else:                                all_sources += [f"imgui_impl_{backend_name}.cpp"]
+		if backend_name in ["osx", "metal"]: backend_sources += [[backend_name, f"imgui_impl_{backend_name}.mm"]]
+		else:                                backend_sources += [[backend_name, f"imgui_impl_{backend_name}.cpp"]]
 
 		if backend_name == "opengl3":
-			shutil.copy(pp("imgui/backends/imgui_impl_opengl3_loader.h"), "temp")
+			temp_files += [pp("imgui/backends/imgui_impl_opengl3_loader.h")]
 
 		for define in backend.get("defines", []): compile_flags += [platform_select({ "windows": f"/D{define}", "linux, darwin": f"-D{define}" })]
 
-	# Add backend dependency include paths
-	for backend_dep in backend_deps_names:
+	# Backend dependency include paths. Relative to the folder the sources are compiled in, so added for each target.
+	backend_include_dirs = []
+	for backend_dep in sorted(backend_deps_names):
 		include_path = path.join(backend_deps[backend_dep]["path"], "include")
 		if "include" in backend_deps[backend_dep]:
 			include_path = backend_deps[backend_dep]["include"]
+		backend_include_dirs.append(path.join("backend_deps", include_path))
 
-		if platform_win32_like:  compile_flags += ["/I" + path.join("..", "backend_deps", include_path)]
-		elif platform_unix_like: compile_flags += ["-I" + path.join("..", "backend_deps", include_path)]
+	lto = profile.get("lto", False)
+	compiler_version = get_compiler_version()
+	# Shared by the targets, so that building them side by side runs at most `--jobs` compilers
+	compile_slots = threading.BoundedSemaphore(args.jobs)
 
-	all_objects = []
-	if platform_win32_like:  all_objects += map(lambda file: file.removesuffix(".cpp") + ".obj", all_sources)
-	elif platform_unix_like:
-		for file in all_sources:
-			if file.endswith(".cpp"): all_objects.append(file.removesuffix(".cpp") + ".o")
-			elif file.endswith(".mm"): all_objects.append(file.removesuffix(".mm") + ".o")
+	def build_target(target: str) -> typing.List[typing.List]:
+		""" Compiles and archives the core and backends for `target`, a key into build_targets, or the host if None.
+		Returns the archives as [dest_binary, sources], and the object cache stats of each build. """
+		work_dir = "temp" if target == None else path.join("temp", target)
+		target_flags = compile_flags + target_compile_flags(target)
+		for include_dir in backend_include_dirs:
+			if platform_win32_like:  target_flags += ["/I" + path.relpath(include_dir, work_dir)]
+			elif platform_unix_like: target_flags += ["-I" + path.relpath(include_dir, work_dir)]
 
-	os.chdir("temp")
+		# The core goes in one archive, and each backend in its own
+		stage = args.profile if target == None else f"{args.profile}:{target}"
+		archives = [[get_platform_imgui_lib_name(profile["archive_suffix"], target), core_sources]]
+		for [backend_name, source] in backend_sources:
+			archives.append([get_platform_backend_lib_name(backend_name, profile["archive_suffix"], target), [source]])
+		all_sources = [source for [_dest_binary, sources] in archives for source in sources]
 
-	# cl.exe, *in particular*, won't work without running vcvarsall first, even if cl.exe is in the path.
-	# See did_re_execute
-	if platform_win32_like:  exec_vcvars(["cl"] + compile_flags + ["/c"] + all_sources, "Compiling sources")
-	elif platform_unix_like: exec(["clang"] + compile_flags + ["-c"] + all_sources, "Compiling sources")
+		# Archives of backends which aren't enabled anymore would only get linked with stale code
+		built_backends = [backend_name for [backend_name, _source] in backend_sources]
+		for backend_name in backends:
+			stale_binary = get_platform_backend_lib_name(backend_name, profile["archive_suffix"], target)
+			if not backend_name in built_backends and path.isfile(stale_binary):
+				print(f"Removing {stale_binary}, as backend '{backend_name}' is not enabled")
+				os.remove(stale_binary)
+
+		# Everything which can affect the compiled objects. Backend dependencies are pinned, so their commit stands in for their headers.
+		compile_inputs = hash_inputs(
+			[compiler_version, f"unity:{args.unity}"] + target_flags + all_sources +
+			[f"{path.basename(file)}:{hash_file(file)}" for file in temp_files] +
+			[git_head(path.join("backend_deps", backend_deps[backend_dep]["path"])) for backend_dep in sorted(backend_deps_names)]
+		)
+
+		target_cache_stats = []
+		if profile.get("pgo", False):
+			os.makedirs(pgo_dir, exist_ok=True)
+			instrumented_binary = path.join(pgo_dir, get_platform_imgui_lib_name("_instrumented"))
+			profile_data = path.join(pgo_dir, "imgui.profdata")
+
+			# Stage 1: Instrumented build, and training run to collect the profile
+			instrumented_flags = target_flags + ["-fprofile-instr-generate"]
+			instrumented_inputs = hash_inputs([compile_inputs, "instrumented"])
+			# Only the core is exercised by the training workload
+			target_cache_stats.append(build_libraries(f"{args.profile}-instrumented", [[instrumented_binary, core_sources]], temp_files, instrumented_flags, instrumented_inputs, compiler_version, lto, args, manifest))
+			with traced_stage("PGO training"):
+				run_pgo_training(instrumented_binary, profile_data, manifest)
+
+			# Stage 2: Optimized build using the profile. The profile's content isn't part of the flags, so add it to the inputs.
+			profile_hash = hash_file(profile_data)
+			optimized_flags = target_flags + ["-fprofile-instr-use=" + path.abspath(profile_data), "-Wno-profile-instr-unprofiled", "-Wno-profile-instr-out-of-date"]
+			optimized_inputs = hash_inputs([compile_inputs, profile_hash])
+			target_cache_stats.append(build_libraries(args.profile, archives, temp_files, optimized_flags, optimized_inputs, compiler_version, lto, args, manifest, extra_cache_inputs=[profile_hash], keep_symbols=used_bindings))
+		else:
+			target_cache_stats.append(build_libraries(stage, archives, temp_files, target_flags, compile_inputs, compiler_version, lto, args, manifest, keep_symbols=used_bindings, target=target, slots=compile_slots))
 
-	os.chdir("..")
+		return [archives, target_cache_stats]
 
-	dest_binary = get_platform_imgui_lib_name()
+	all_archives = []
+	all_cache_stats = []
+	if len(args.targets) == 0:
+		[all_archives, all_cache_stats] = build_target(None)
+	else:
+		# Each target compiles in its own folder, with its own object cache, so they only share the compiler processes
+		with traced_stage(f"Building {len(args.targets)} targets"):
+			with ThreadPoolExecutor(max_workers=len(args.targets)) as executor:
+				futures = [executor.submit(build_target, target) for target in args.targets]
+				for future in futures:
+					[archives, cache_stats] = future.result()
+					all_archives += archives
+					all_cache_stats += cache_stats
 
-	if platform_win32_like:  exec(["lib", "/OUT:" + dest_binary] + map_to_folder(all_objects, "temp"), "Making library from objects")
-	elif platform_unix_like: exec(["ar", "rcs", dest_binary] + map_to_folder(all_objects, "temp"), "Making library from objects")
+	# Without --targets, this is the host's core archive
+	dest_binary = all_archives[0][0]
 
-	expected_files = ["imgui.odin", "impl_enabled.odin", dest_binary]
+	expected_files = ["imgui.odin", "impl_enabled.odin"] + [archive_binary for [archive_binary, _sources] in all_archives]
 
 	for file in expected_files:
 		assertx(path.isfile(file), f"Missing file '{file}' in build folder! Something went wrong..")
 
+	if used_bindings != None:
+		unstripped_size = manifest[f"archive:{args.profile}:{dest_binary}"].get("unstripped_size")
+		stripped_size = path.getsize(dest_binary) if unstripped_size != None else None
+		write_strip_report(strip_report_path, args.strip_unused, used_bindings, len(find_imgui_bindings(get_bindings_files())), unstripped_size, stripped_size)
+
+	all_cache_stats = [cache_stats for cache_stats in all_cache_stats if cache_stats != None]
+	if len(all_cache_stats) > 0 and not args.no_cache:
+		hits    = sum(cache_stats["hits"]    for cache_stats in all_cache_stats)
+		misses  = sum(cache_stats["misses"]  for cache_stats in all_cache_stats)
+		evicted = sum(cache_stats["evicted"] for cache_stats in all_cache_stats)
+		print(f'Object cache: {hits} hits, {misses} misses, {evicted} evicted')
+
+	# Other targets can't run here, and a stripped archive only keeps the C functions the project uses
+	if check_inline_procs and len(args.targets) == 0 and used_bindings == None:
+		if not has_tool("odin"): print("odin not found, so the inlined procs aren't checked against C")
+		else:
+			with traced_stage("Checking inlined procs"):
+				run_inline_check(dest_binary, lto, manifest)
+
+	if args.frame_benchmark:
+		with traced_stage("Frame benchmark"):
+			results_path = run_frame_benchmark(dest_binary, args.profile, lto)
+		print(f"Frame benchmark results written to {results_path}")
+		if args.frame_baseline != None: compare_frame_benchmarks(args.frame_baseline, results_path)
+
+	trace_event("Total", "stage", build_trace_start, cpu_time())
+	print()
+	print(format_trace_summary())
+	print(f"Build trace written to {args.trace}")
+
 	print("Looks like everything went ok!")
 
 if __name__ == "__main__":
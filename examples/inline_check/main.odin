@@ -0,0 +1,163 @@
+package imgui_example_inline_check
+
+// Checks that the procs gen_odin.py writes in Odin instead of binding (see _inline_function_bodies in gen_odin.py)
+// give bit for bit the same results as imgui's C functions, for random inputs and inputs outside the expected range.
+// The C functions are bound below, straight from the core archive, so they're called whatever the bindings do.
+// Prints the first mismatches, and exits with 1 if there were any.
+//
+// `python build.py` builds and runs this against the library it built, if odin is available (see check_inline_procs).
+
+import im "../.."
+
+import "core:fmt"
+import "core:math"
+import "core:math/rand"
+import "core:os"
+
+when      ODIN_OS == .Windows { when ODIN_ARCH == .amd64 { foreign import lib "../../imgui_windows_x64.lib" } else { foreign import lib "../../imgui_windows_arm64.lib" } }
+else when ODIN_OS == .Linux   { when ODIN_ARCH == .amd64 { foreign import lib "../../imgui_linux_x64.a" }     else { foreign import lib "../../imgui_linux_arm64.a" } }
+else when ODIN_OS == .Darwin  { when ODIN_ARCH == .amd64 { foreign import lib "../../imgui_darwin_x64.a" }    else { foreign import lib "../../imgui_darwin_arm64.a" } }
+
+foreign lib {
+	@(link_name="ImGui_ColorConvertU32ToFloat4")       c_ColorConvertU32ToFloat4           :: proc(_in: u32) -> im.Vec4 ---
+	@(link_name="ImGui_ColorConvertFloat4ToU32")       c_ColorConvertFloat4ToU32           :: proc(_in: im.Vec4) -> u32 ---
+	@(link_name="ImGui_ColorConvertRGBtoHSV")          c_ColorConvertRGBtoHSV              :: proc(r, g, b: f32, out_h, out_s, out_v: ^f32) ---
+	@(link_name="ImGui_ColorConvertHSVtoRGB")          c_ColorConvertHSVtoRGB              :: proc(h, s, v: f32, out_r, out_g, out_b: ^f32) ---
+	@(link_name="ImDrawList_PathClear")                c_DrawList_PathClear                :: proc(self: ^im.DrawList) ---
+	@(link_name="ImDrawList_PathLineTo")               c_DrawList_PathLineTo               :: proc(self: ^im.DrawList, pos: im.Vec2) ---
+	@(link_name="ImDrawList_PathLineToMergeDuplicate") c_DrawList_PathLineToMergeDuplicate :: proc(self: ^im.DrawList, pos: im.Vec2) ---
+}
+
+SAMPLES :: 100_000
+MAX_REPORTED :: 20
+
+mismatches := 0
+
+// Values at, and well past, the edges of what the procs expect. Filled in by main.
+edge_values: [dynamic]f32
+
+// Half the time a value in or around 0..1, otherwise an edge value
+random_f32 :: proc(non_finite: bool) -> f32 {
+	if rand.int_max(2) == 0 do return rand.float32_range(-2, 3)
+	for {
+		value := edge_values[rand.int_max(len(edge_values))]
+		if non_finite || !(math.is_nan(value) || math.is_inf(value)) do return value
+	}
+}
+
+// NaN payloads depend on which instructions the compiler picked, rather than on the math, so any NaN matches any other
+same_f32 :: proc(a, b: f32) -> bool {
+	return transmute(u32)a == transmute(u32)b || (math.is_nan(a) && math.is_nan(b))
+}
+
+same_f32s :: proc(a, b: []f32) -> bool {
+	for i in 0..<len(a) {
+		if !same_f32(a[i], b[i]) do return false
+	}
+	return true
+}
+
+report :: proc(name: string, same: bool, input: any, odin_result: any, c_result: any) {
+	if same do return
+	mismatches += 1
+	if mismatches <= MAX_REPORTED do fmt.eprintf("%s(%v): Odin gives %v, C gives %v\n", name, input, odin_result, c_result)
+}
+
+check_color_convert :: proc() {
+	for _ in 0..<SAMPLES {
+		color := rand.uint32()
+		odin_rgba, c_rgba := im.ColorConvertU32ToFloat4(color), c_ColorConvertU32ToFloat4(color)
+		report("ColorConvertU32ToFloat4", same_f32s(odin_rgba[:], c_rgba[:]), color, odin_rgba, c_rgba)
+	}
+
+	// Converting NaN to an int is undefined in C
+	for _ in 0..<SAMPLES {
+		rgba := im.Vec4{random_f32(false), random_f32(false), random_f32(false), random_f32(false)}
+		odin_color, c_color := im.ColorConvertFloat4ToU32(rgba), c_ColorConvertFloat4ToU32(rgba)
+		report("ColorConvertFloat4ToU32", odin_color == c_color, rgba, odin_color, c_color)
+	}
+
+	for _ in 0..<SAMPLES {
+		rgb := [3]f32{random_f32(true), random_f32(true), random_f32(true)}
+		odin_hsv, c_hsv: [3]f32
+		im.ColorConvertRGBtoHSV(rgb[0], rgb[1], rgb[2], &odin_hsv[0], &odin_hsv[1], &odin_hsv[2])
+		c_ColorConvertRGBtoHSV(rgb[0], rgb[1], rgb[2], &c_hsv[0], &c_hsv[1], &c_hsv[2])
+		report("ColorConvertRGBtoHSV", same_f32s(odin_hsv[:], c_hsv[:]), rgb, odin_hsv, c_hsv)
+	}
+
+	// The hue goes through ImFmod and then to an int, which is undefined in C for infinities and NaN
+	for _ in 0..<SAMPLES {
+		hsv := [3]f32{random_f32(false), random_f32(true), random_f32(true)}
+		odin_rgb, c_rgb: [3]f32
+		im.ColorConvertHSVtoRGB(hsv[0], hsv[1], hsv[2], &odin_rgb[0], &odin_rgb[1], &odin_rgb[2])
+		c_ColorConvertHSVtoRGB(hsv[0], hsv[1], hsv[2], &c_rgb[0], &c_rgb[1], &c_rgb[2])
+		report("ColorConvertHSVtoRGB", same_f32s(odin_rgb[:], c_rgb[:]), hsv, odin_rgb, c_rgb)
+	}
+}
+
+same_path :: proc(a, b: ^im.DrawList) -> bool {
+	if a._Path.Size != b._Path.Size do return false
+	a_points, b_points := ([^][2]u32)(a._Path.Data), ([^][2]u32)(b._Path.Data)
+	for i in 0..<a._Path.Size {
+		if a_points[i] != b_points[i] do return false
+	}
+	return true
+}
+
+check_path_procs :: proc() {
+	// Two draw lists, one only ever changed through the Odin procs, the other through C
+	odin_list, c_list := im.GetForegroundDrawList(), im.GetBackgroundDrawList()
+	im.DrawList_PathClear(odin_list)
+	c_DrawList_PathClear(c_list)
+
+	pos: im.Vec2
+	for _ in 0..<SAMPLES {
+		// Often the same point again, so that merging duplicates is exercised. Compared bitwise, so -0 and 0 differ.
+		if rand.int_max(3) != 0 do pos = {random_f32(true), random_f32(true)}
+
+		// Paths are cleared rarely enough that they keep growing past their capacity, which the Odin procs leave to C
+		switch rand.int_max(100) {
+		case 0:
+			im.DrawList_PathClear(odin_list)
+			c_DrawList_PathClear(c_list)
+		case 1..<50:
+			im.DrawList_PathLineTo(odin_list, pos)
+			c_DrawList_PathLineTo(c_list, pos)
+		case:
+			im.DrawList_PathLineToMergeDuplicate(odin_list, pos)
+			c_DrawList_PathLineToMergeDuplicate(c_list, pos)
+		}
+		report("DrawList_Path*", same_path(odin_list, c_list), pos, odin_list._Path.Size, c_list._Path.Size)
+	}
+}
+
+main :: proc() {
+	negative_zero := transmute(f32)u32(0x8000_0000)
+	smallest_denormal := transmute(f32)u32(1)
+	append(&edge_values, 0, negative_zero, 1, -1, 0.5, 1.0 / 6.0, 5.0 / 6.0, 0.99999994, 1.0000001, 2, -2, 255,
+		8388607.5, 16777216, 1e-20, -1e-20, smallest_denormal, 1e30, -1e30, math.F32_MAX, -math.F32_MAX,
+		math.inf_f32(1), math.inf_f32(-1), math.nan_f32())
+
+	im.CHECKVERSION()
+	im.CreateContext()
+	defer im.DestroyContext()
+	io := im.GetIO()
+
+	tex_pixels: ^u8
+	tex_w, tex_h: i32
+	im.FontAtlas_GetTexDataAsRGBA32(io.Fonts, &tex_pixels, &tex_w, &tex_h)
+	io.DisplaySize = {1920, 1080}
+	io.DeltaTime = 1.0 / 60.0
+
+	check_color_convert()
+
+	im.NewFrame()
+	check_path_procs()
+	im.EndFrame()
+
+	if mismatches > 0 {
+		fmt.eprintf("%v results of inlined procs differ from C\n", mismatches)
+		os.exit(1)
+	}
+	fmt.println("Inlined procs match C")
+}
@@ -0,0 +1,354 @@
+package imgui_example_null_benchmark
+
+// Headless benchmark of imgui's CPU cost, through these bindings. Like the "null" example, nothing is rendered,
+// so it runs without a window or GPU. Each scene gets a fresh context, which is warmed up, and then measured:
+// the CPU time from NewFrame() to Render(), the vertices and indices drawn, and imgui's allocations.
+//
+// Usage: odin run examples/null_benchmark -o:speed -- [-frames:N] [-warmup:N] [-scene:NAME]... [-label:TEXT] [-out:PATH]
+//  - frames, warmup: How many frames each scene is measured for, after how many frames of warmup
+//  - scene: Only run the named scenes. Can be repeated
+//  - label: Recorded in the results, eg. the build profile
+//  - out: Write the results to PATH as JSON, so they can be compared across build profiles and imgui versions.
+//    `python build.py --frame-benchmark` does this for the profile it builds.
+
+import im "../.."
+
+import "core:c"
+import "core:c/libc"
+import "core:encoding/json"
+import "core:fmt"
+import "core:math"
+import "core:os"
+import "core:slice"
+import "core:strconv"
+import "core:strings"
+import "core:time"
+
+Options :: struct {
+	frames: int,
+	warmup: int,
+	scenes: [dynamic]string,
+	label:  string,
+	out:    string,
+}
+
+Scene :: struct {
+	name:  string,
+	setup: proc(io: ^im.IO),
+	draw:  proc(frame: int),
+}
+
+Scene_Result :: struct {
+	name:                      string,
+	frame_ms_p50:              f64,
+	frame_ms_p99:              f64,
+	frame_ms_mean:             f64,
+	frame_ms_max:              f64,
+	vertices:                  int, // Per frame, on average
+	indices:                   int,
+	allocations_per_frame:     f64,
+	allocated_bytes_per_frame: f64,
+}
+
+Results :: struct {
+	label:         string,
+	imgui_version: string,
+	odin_os:       string,
+	odin_arch:     string,
+	frames:        int,
+	warmup:        int,
+	scenes:        []Scene_Result,
+}
+
+SCENES :: [?]Scene {
+	{ "table",      nil,           scene_table },
+	{ "text",       nil,           scene_text },
+	{ "tree",       nil,           scene_tree },
+	{ "windows",    nil,           scene_windows },
+	{ "docking",    setup_docking, scene_docking },
+	{ "input_text", nil,           scene_input_text },
+}
+
+main :: proc() {
+	options, ok := parse_options()
+	if !ok do os.exit(2)
+
+	results := Results {
+		label     = options.label,
+		odin_os   = fmt.tprint(ODIN_OS),
+		odin_arch = fmt.tprint(ODIN_ARCH),
+		frames    = options.frames,
+		warmup    = options.warmup,
+	}
+	scene_results: [dynamic]Scene_Result
+
+	fmt.printf("%-12s %10s %10s %10s %10s %10s %12s\n", "scene", "p50 ms", "p99 ms", "vertices", "indices", "allocs", "alloc bytes")
+	for scene in SCENES {
+		if len(options.scenes) > 0 && !slice.contains(options.scenes[:], scene.name) do continue
+
+		result := run_scene(scene, options)
+		fmt.printf("%-12s %10.3f %10.3f %10d %10d %10.1f %12.0f\n", result.name, result.frame_ms_p50, result.frame_ms_p99,
+			result.vertices, result.indices, result.allocations_per_frame, result.allocated_bytes_per_frame)
+		append(&scene_results, result)
+	}
+	results.scenes = scene_results[:]
+	results.imgui_version = string(im.GetVersion())
+
+	if options.out != "" {
+		data, err := json.marshal(results, { pretty = true })
+		if err != nil {
+			fmt.eprintln("Couldn't encode the results:", err)
+			os.exit(1)
+		}
+		if !os.write_entire_file(options.out, data) {
+			fmt.eprintln("Couldn't write", options.out)
+			os.exit(1)
+		}
+		fmt.println("Results written to", options.out)
+	}
+}
+
+parse_options :: proc() -> (options: Options, ok: bool) {
+	options.frames = 600
+	options.warmup = 60
+
+	for arg in os.args[1:] {
+		if strings.has_prefix(arg, "-frames:") {
+			options.frames, ok = strconv.parse_int(arg[len("-frames:"):])
+			if !ok || options.frames <= 0 do return options, false
+		} else if strings.has_prefix(arg, "-warmup:") {
+			options.warmup, ok = strconv.parse_int(arg[len("-warmup:"):])
+			if !ok || options.warmup < 0 do return options, false
+		} else if strings.has_prefix(arg, "-scene:") {
+			append(&options.scenes, arg[len("-scene:"):])
+		} else if strings.has_prefix(arg, "-label:") {
+			options.label = arg[len("-label:"):]
+		} else if strings.has_prefix(arg, "-out:") {
+			options.out = arg[len("-out:"):]
+		} else {
+			fmt.eprintln("Unknown argument:", arg)
+			return options, false
+		}
+	}
+
+	return options, true
+}
+
+// ALLOCATIONS
+// imgui allocates through these, so allocations can be counted per frame
+
+Alloc_Counts :: struct {
+	allocations: int,
+	bytes:       int,
+}
+
+alloc_counts: Alloc_Counts
+
+counting_alloc :: proc "c" (size: c.size_t, user_data: rawptr) -> rawptr {
+	alloc_counts.allocations += 1
+	alloc_counts.bytes += int(size)
+	return libc.malloc(size)
+}
+
+counting_free :: proc "c" (ptr: rawptr, user_data: rawptr) {
+	libc.free(ptr)
+}
+
+run_scene :: proc(scene: Scene, options: Options) -> Scene_Result {
+	im.SetAllocatorFunctions(counting_alloc, counting_free)
+	im.CreateContext()
+	defer im.DestroyContext()
+
+	io := im.GetIO()
+	io.IniFilename = nil // Don't load or save window positions, so every run starts the same
+	io.DisplaySize = {1920, 1080}
+	io.DeltaTime = 1.0 / 60.0
+
+	// Build atlas
+	tex_pixels: ^u8
+	tex_w, tex_h: i32
+	im.FontAtlas_GetTexDataAsRGBA32(io.Fonts, &tex_pixels, &tex_w, &tex_h)
+
+	if scene.setup != nil do scene.setup(io)
+
+	frame_ms := make([]f64, options.frames)
+	defer delete(frame_ms)
+	result := Scene_Result { name = scene.name }
+	allocations, allocated_bytes: int
+
+	for frame in 0..<options.warmup + options.frames {
+		alloc_counts = {}
+		start := time.tick_now()
+		im.NewFrame()
+		scene.draw(frame)
+		im.Render()
+		elapsed := time.tick_since(start)
+
+		if frame < options.warmup do continue
+		frame_ms[frame - options.warmup] = time.duration_milliseconds(elapsed)
+		draw_data := im.GetDrawData()
+		result.vertices += int(draw_data.TotalVtxCount)
+		result.indices += int(draw_data.TotalIdxCount)
+		allocations += alloc_counts.allocations
+		allocated_bytes += alloc_counts.bytes
+	}
+
+	result.vertices /= options.frames
+	result.indices /= options.frames
+	result.allocations_per_frame = f64(allocations) / f64(options.frames)
+	result.allocated_bytes_per_frame = f64(allocated_bytes) / f64(options.frames)
+
+	result.frame_ms_mean = math.sum(frame_ms) / f64(options.frames)
+	slice.sort(frame_ms)
+	result.frame_ms_p50 = frame_ms[len(frame_ms) * 50 / 100]
+	result.frame_ms_p99 = frame_ms[min(len(frame_ms) - 1, len(frame_ms) * 99 / 100)]
+	result.frame_ms_max = frame_ms[len(frame_ms) - 1]
+
+	return result
+}
+
+// SCENES
+
+TABLE_ROWS :: 100_000
+TABLE_COLUMNS :: 8
+
+// A scrolling table with a lot of rows, of which only the visible ones are submitted
+scene_table :: proc(frame: int) {
+	im.SetNextWindowPos({0, 0})
+	im.SetNextWindowSize({1920, 1080})
+	im.Begin("Table")
+	flags := im.TableFlags_Borders | im.TableFlags_RowBg | im.TableFlags_ScrollY | im.TableFlags_Resizable | im.TableFlags_Reorderable | im.TableFlags_Hideable
+	if im.BeginTable("table", TABLE_COLUMNS, flags) {
+		im.TableSetupScrollFreeze(0, 1)
+		for column in 0..<TABLE_COLUMNS do im.TableSetupColumn(fmt.ctprintf("Column %d", column))
+		im.TableHeadersRow()
+
+		clipper: im.ListClipper
+		im.ListClipper_Begin(&clipper, TABLE_ROWS)
+		for im.ListClipper_Step(&clipper) {
+			for row in clipper.DisplayStart..<clipper.DisplayEnd {
+				im.TableNextRow()
+				for column in 0..<TABLE_COLUMNS {
+					im.TableNextColumn()
+					im.Text("Row %d, column %d", row, c.int(column))
+				}
+			}
+		}
+		im.EndTable()
+	}
+	im.End()
+	free_all(context.temp_allocator)
+}
+
+TEXT_LINES :: 5_000
+
+// A lot of formatted text, most of it scrolled out of view
+scene_text :: proc(frame: int) {
+	im.SetNextWindowPos({0, 0})
+	im.SetNextWindowSize({1920, 1080})
+	im.Begin("Text")
+	for line in 0..<TEXT_LINES {
+		im.Text("Line %d: The quick brown fox jumps over the lazy dog, %.2f times", c.int(line), f64(line) * 0.5)
+	}
+	im.End()
+}
+
+TREE_DEPTH :: 7
+TREE_BRANCHES :: 3
+
+tree_node :: proc(depth: int) {
+	for branch in 0..<TREE_BRANCHES {
+		im.PushIDInt(c.int(branch))
+		im.SetNextItemOpen(true, .Once)
+		if im.TreeNode("Node") {
+			if depth < TREE_DEPTH do tree_node(depth + 1)
+			im.TreePop()
+		}
+		im.PopID()
+	}
+}
+
+// Every node of a deep tree is open
+scene_tree :: proc(frame: int) {
+	im.SetNextWindowPos({0, 0})
+	im.SetNextWindowSize({1920, 1080})
+	im.Begin("Tree")
+	tree_node(1)
+	im.End()
+}
+
+WINDOWS :: 200
+
+// A lot of small windows, with a few widgets each
+scene_windows :: proc(frame: int) {
+	@(static) values: [WINDOWS]f32
+	@(static) checked: [WINDOWS]bool
+	for window in 0..<WINDOWS {
+		im.SetNextWindowPos({f32(window % 20) * 90, f32(window / 20) * 100}, .Once)
+		im.SetNextWindowSize({200, 120}, .Once)
+		im.Begin(fmt.ctprintf("Window %d", window))
+		im.Text("Frame %d", c.int(frame))
+		im.SliderFloat("Value", &values[window], 0, 1)
+		im.Checkbox("Checked", &checked[window])
+		im.Button("Button")
+		im.End()
+	}
+	free_all(context.temp_allocator)
+}
+
+DOCK_SPACES :: 4
+DOCKED_WINDOWS :: 6
+
+setup_docking :: proc(io: ^im.IO) {
+	io.ConfigFlags += {.DockingEnable}
+}
+
+// Windows docked as tabs, into dock spaces nested in windows which are docked themselves.
+// Splitting nodes needs DockBuilder, which is in imgui_internal.h, so isn't bound.
+scene_docking :: proc(frame: int) {
+	main_dock_space := im.DockSpaceOverViewport()
+	for dock_space in 0..<DOCK_SPACES {
+		im.SetNextWindowDockID(main_dock_space, .Once)
+		im.Begin(fmt.ctprintf("Dock space %d", dock_space))
+		dock_space_id := im.GetID(fmt.ctprintf("Dock space %d", dock_space))
+		im.DockSpace(dock_space_id)
+		im.End()
+
+		for window in 0..<DOCKED_WINDOWS {
+			im.SetNextWindowDockID(dock_space_id, .Once)
+			im.Begin(fmt.ctprintf("Docked %d.%d", dock_space, window))
+			im.Text("Frame %d", c.int(frame))
+			im.End()
+		}
+	}
+	free_all(context.temp_allocator)
+}
+
+INPUT_TEXT_BYTES :: 64 * 1024
+INPUT_TEXT_FIELDS :: 100
+
+input_text_buffer: [INPUT_TEXT_BYTES]u8
+input_text_fields: [INPUT_TEXT_FIELDS][64]u8
+
+// A big multiline InputText, which is active, so it's reprocessed every frame, along with a lot of single line fields
+scene_input_text :: proc(frame: int) {
+	if frame == 0 {
+		builder := strings.builder_from_bytes(input_text_buffer[:len(input_text_buffer) - 1])
+		for line := 0; strings.builder_len(builder) < INPUT_TEXT_BYTES - 128; line += 1 {
+			fmt.sbprintf(&builder, "Line %d: The quick brown fox jumps over the lazy dog\n", line)
+		}
+		for &field, field_index in input_text_fields do fmt.bprintf(field[:len(field) - 1], "Field %d", field_index)
+	}
+
+	im.SetNextWindowPos({0, 0})
+	im.SetNextWindowSize({1920, 1080})
+	im.Begin("Input text")
+	if frame == 0 do im.SetKeyboardFocusHere()
+	im.InputTextMultiline("##text", cstring(&input_text_buffer[0]), len(input_text_buffer), {-1, 600})
+	for &field, field_index in input_text_fields {
+		im.PushIDInt(c.int(field_index))
+		im.InputText("##field", cstring(&field[0]), len(field))
+		im.PopID()
+	}
+	im.End()
+}
@@ -1,9 +1,19 @@
 import json
+import re
+import difflib
 import typing
 import ast
 import argparse
 import sys
+import io
+import os
+import time
+import tempfile
 from os import path
+from dataclasses import dataclass, replace
+
+try: import resource
+except ImportError: resource = None # Not available on Windows
 
 # TODO:
 # - Get rid of any special handling of values
@@ -47,7 +57,22 @@ def die(message):
 	exit(1)
 
 def write_line(file: typing.IO, line: str = "", indent = 0):
-	file.writelines(["\t" * indent, line, "\n"])
+	file.write("\t" * indent + line + "\n")
+
+def write_file_if_changed(file_path: str, content: str) -> bool:
+	""" Writes `content` to `file_path` in one go, unless the file already has exactly these bytes.
+	The content goes to a temporary file next to the destination first, which is then renamed over it,
+	so nothing ever sees a half written file. Returns whether the file was written. """
+	data = content.encode("utf-8")
+	if path.isfile(file_path):
+		with open(file_path, "rb") as file:
+			if file.read() == data: return False
+
+	temp_path = file_path + ".tmp"
+	with open(temp_path, "wb") as file:
+		file.write(data)
+	os.replace(temp_path, file_path)
+	return True
 
 def strip_prefix_optional(prefix: str, string: str) -> str:
 	if string.startswith(prefix): return string.removeprefix(prefix)
@@ -162,6 +187,12 @@ _type_aliases = {
 
 	"size_t": "c.size_t",
 
+	# Only used by the backends
+	"int32_t": "i32",
+	"uint32_t": "u32",
+	"int64_t": "i64",
+	"uint64_t": "u64",
+
 	"va_list": "libc.va_list",
 }
 
@@ -187,7 +218,7 @@ def parse_type(type_dict, in_function=False) -> str:
 		details = type_dict["type_details"]
 		assert(details["flavour"] == "function_pointer")
 
-		return function_to_string(details)
+		return function_to_string(parse_function(details))
 
 	return parse_type_desc(type_dict["description"], in_function)
 
@@ -198,6 +229,7 @@ def parse_type_desc(type_desc, in_function=False) -> str:
 		return make_type_odiney(type_desc["builtin_type"])
 
 	elif kind == "User":
+		if current_backend != None: return backend_type_odiney(type_desc["name"])
 		return make_type_odiney(type_desc["name"])
 
 	elif kind == "Pointer":
@@ -265,6 +297,251 @@ def get_array_count(type_desc) -> str:
 
 	return None
 
+# INTERMEDIATE REPRESENTATION
+# c_imgui.json is parsed into these once, and everything is written from them.
+# Names are interned, and types are already converted to Odin.
+# Conditionals are kept as they are, since evaluating them depends on the defines.
+
+@dataclass(slots=True)
+class Comments:
+	preceding: typing.Tuple[str, ...] = ()
+	attached: str = None
+
+_no_comments = Comments()
+
+# Shared between every field/argument with the same type, so it must not be modified
+@dataclass(slots=True, frozen=True)
+class Type:
+	declaration: str # As written in C, eg. "const char*"
+	odin: str
+
+@dataclass(slots=True)
+class Define:
+	name: str
+	content: str # None if the define has no value
+	is_user_define: bool # Comes from imconfig.h, rather than imgui.h
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Element:
+	name: str
+	value_expression: str # None if the element has no explicit value
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Enum:
+	name: str
+	elements: typing.List[Element]
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Field:
+	name: str
+	type: Type
+	width: int # Bit width of bitfields, otherwise None
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Struct:
+	name: str
+	is_union: bool
+	is_anonymous: bool
+	fields: typing.List[Field]
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Argument:
+	name: str
+	type: Type # None for varargs
+	is_varargs: bool
+	default_value: str # Already converted to Odin, None if there's no default
+
+@dataclass(slots=True)
+class Function:
+	name: str # None for function pointer types
+	original_name: str # The C++ name, shared by overloads, eg. ImGui::GetColorU32. None for function pointer types
+	arguments: typing.List[Argument]
+	return_type: Type
+	is_default_argument_helper: bool
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Typedef:
+	name: str
+	type: Type
+	conditionals: typing.Tuple[typing.Tuple[str, str], ...]
+	comments: Comments
+
+@dataclass(slots=True)
+class Bindings:
+	defines: typing.List[Define]
+	enums: typing.List[Enum]
+	structs: typing.List[Struct]
+	functions: typing.List[Function]
+	typedefs: typing.List[Typedef]
+
+def parse_comments(json_item) -> Comments:
+	comments = json_item.get("comments")
+	if comments == None: return _no_comments
+	attached = comments.get("attached")
+	return Comments(tuple(comments.get("preceding", [])), attached)
+
+def parse_conditionals(json_item) -> typing.Tuple[typing.Tuple[str, str], ...]:
+	return tuple((sys.intern(conditional["condition"]), sys.intern(conditional["expression"])) for conditional in json_item.get("conditionals", []))
+
+# Hit/miss counts of the caches below, printed with --stats
+cache_stats = {
+	"type":        [0, 0],
+	"conditional": [0, 0],
+}
+
+def count_cache_lookup(cache_name: str, hit: bool):
+	cache_stats[cache_name][0 if hit else 1] += 1
+
+# Types only depend on the json, never on defines, so this lives for the whole process
+_type_cache = {}
+
+def type_desc_fingerprint(type_desc) -> tuple:
+	""" Returns a hashable fingerprint of everything in a type description which affects its Odin type """
+	inner = type_desc.get("inner_type")
+	return (type_desc["kind"], type_desc.get("builtin_type"), type_desc.get("name"), type_desc.get("bounds"), type_desc_fingerprint(inner) if inner != None else None)
+
+def parse_type_ir(type_dict, in_function=False) -> Type:
+	# Function pointers are spelled out completely by their declaration
+	if "type_details" in type_dict: key = (type_dict["declaration"], True, in_function)
+	else:                           key = (type_dict["declaration"], type_desc_fingerprint(type_dict["description"]), in_function)
+
+	parsed = _type_cache.get(key)
+	count_cache_lookup("type", parsed != None)
+	if parsed == None:
+		parsed = Type(sys.intern(type_dict["declaration"]), sys.intern(parse_type(type_dict, in_function)))
+		_type_cache[key] = parsed
+
+	return parsed
+
+def parse_function(json_function) -> Function:
+	arguments = []
+	for argument in json_function["arguments"]:
+		if argument["is_varargs"]:
+			# These don't have a type field
+			arguments.append(Argument(sys.intern(argument["name"]), None, True, None))
+			continue
+
+		argument_type = parse_type_ir(argument["type"], in_function=True)
+		default_value = None
+		if "default_value" in argument:
+			default_value = make_value_odiney(argument["default_value"], argument_type.odin)
+		arguments.append(Argument(sys.intern(argument["name"]), argument_type, False, default_value))
+
+	name = json_function.get("name")
+	original_name = json_function.get("original_fully_qualified_name")
+	return Function(sys.intern(name) if name != None else None, sys.intern(original_name) if original_name != None else None, arguments, parse_type_ir(json_function["return_type"]),
+		json_function.get("is_default_argument_helper", False), parse_conditionals(json_function), parse_comments(json_function))
+
+def parse_define(define) -> Define:
+	return Define(sys.intern(define["name"]), define.get("content"), not define["source_location"]["filename"].endswith("imgui.h"),
+		parse_conditionals(define), parse_comments(define))
+
+def parse_enum(enum) -> Enum:
+	return Enum(sys.intern(enum["name"]),
+		[Element(sys.intern(element["name"]), element.get("value_expression"), parse_conditionals(element), parse_comments(element)) for element in enum["elements"]],
+		parse_conditionals(enum), parse_comments(enum))
+
+def parse_struct(struct) -> Struct:
+	return Struct(sys.intern(struct["name"]), struct.get("kind") == "union", struct.get("is_anonymous", False),
+		[Field(sys.intern(field["name"]), parse_type_ir(field["type"]), field.get("width"), parse_conditionals(field), parse_comments(field)) for field in struct["fields"]],
+		parse_conditionals(struct), parse_comments(struct))
+
+def parse_typedef(typedef) -> Typedef:
+	return Typedef(sys.intern(typedef["name"]), parse_type_ir(typedef["type"]), parse_conditionals(typedef), parse_comments(typedef))
+
+# Top-level arrays of the json, and what parses their elements. Everything else in the json is ignored.
+_bindings_parsers = {
+	"defines":   parse_define,
+	"enums":     parse_enum,
+	"structs":   parse_struct,
+	"functions": parse_function,
+	"typedefs":  parse_typedef,
+}
+
+def parse_bindings(items: typing.Iterable[typing.Tuple[str, dict]]) -> Bindings:
+	""" Converts the [top-level key, element] pairs of the dear_bindings json (see stream_json_arrays)
+	into the intermediate representation above. Each element can be dropped once it's been parsed. """
+	bindings = Bindings([], [], [], [], [])
+	for [key, item] in items:
+		parser = _bindings_parsers.get(key)
+		if parser != None: getattr(bindings, key).append(parser(item))
+	return bindings
+
+_json_decoder = json.JSONDecoder()
+_json_whitespace = re.compile(r"[ \t\n\r]*")
+
+def stream_json_arrays(file: typing.IO, chunk_size: int = 64 * 1024) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+	""" Yields (key, element) for every element of the arrays in the top-level object of a json file, reading the file in chunks.
+	Only one element is decoded at a time, and the text before it is dropped, so memory use doesn't grow with the file.
+	Top-level values which aren't arrays are skipped. """
+	buffer = ""
+	pos = 0
+	at_end = False
+
+	def read_more():
+		nonlocal buffer, pos, at_end
+		chunk = file.read(chunk_size)
+		at_end = chunk == ""
+		buffer = buffer[pos:] + chunk
+		pos = 0
+
+	def peek() -> str:
+		""" Skips whitespace, and returns the next character, or "" at the end of the file """
+		nonlocal pos
+		while True:
+			pos = _json_whitespace.match(buffer, pos).end()
+			if pos < len(buffer) or at_end: return buffer[pos:pos + 1]
+			read_more()
+
+	def expect(char: str):
+		nonlocal pos
+		if peek() != char: die(f"Expected '{char}' in {file.name}, got '{buffer[pos:pos + 20]}'")
+		pos += 1
+
+	def decode_value():
+		nonlocal pos
+		peek()
+		while True:
+			try:
+				[value, end] = _json_decoder.raw_decode(buffer, pos)
+				# A number could continue in the next chunk
+				if end < len(buffer) or at_end:
+					pos = end
+					return value
+			except json.JSONDecodeError as error:
+				if at_end: die(f"Invalid json in {file.name}: {error}")
+			read_more()
+
+	expect("{")
+	while peek() != "}":
+		key = decode_value()
+		expect(":")
+		if peek() != "[": decode_value()
+		else:
+			pos += 1
+			while peek() != "]":
+				yield (key, decode_value())
+				if peek() == ",": pos += 1
+			pos += 1
+		if peek() == ",": pos += 1
+	expect("}")
+
+def load_bindings(json_path: str) -> Bindings:
+	""" Parses the dear_bindings json as it's read, so the whole document is never in memory at once """
+	with open(json_path, "r") as file: return parse_bindings(stream_json_arrays(file))
+
 def write_section(file: typing.IO, section_name: str):
 	write_line(file)
 	write_line(file, "////////////////////////////////////////////////////////////")
@@ -273,15 +550,15 @@ def write_section(file: typing.IO, section_name: str):
 	write_line(file)
 
 # Writes a line with associated comments.
-# `comment_parent` should be an item from the json file which might have a "comments" field.
+# `comment_parent` should be an item from the bindings, which has `comments`.
 def write_line_with_comments(file: typing.IO, str: str, comment_parent, indent = 0):
-	comment = comment_parent.get("comments", {})
-	for preceding_comment in comment.get("preceding", []):
+	comment = comment_parent.comments
+	for preceding_comment in comment.preceding:
 		write_line(file, preceding_comment, indent)
 
 	attached_comment = ""
-	if "attached" in comment:
-		attached_comment = " " + comment["attached"]
+	if comment.attached != None:
+		attached_comment = " " + comment.attached
 
 	write_line(file, str + attached_comment, indent)
 
@@ -317,31 +594,32 @@ def make_value_odiney(value: str, type_hint: str = None) -> str:
 	return value
 
 # HEADER
-def write_header(file: typing.IO):
-	write_line(file, """package imgui
+_header_c_import = 'import "core:c"'
 
-import "core:c"
+_header_stdcpp_import = 'when ODIN_OS == .Linux || ODIN_OS == .Darwin { @(require) foreign import stdcpp { "system:c++" } }'
 
-when ODIN_OS == .Linux || ODIN_OS == .Darwin { @(require) foreign import stdcpp { "system:c++" } }
-when      ODIN_OS == .Windows { when ODIN_ARCH == .amd64 { foreign import lib "imgui_windows_x64.lib" } else { foreign import lib "imgui_windows_arm64.lib" } }
+_header_lib_import = """when      ODIN_OS == .Windows { when ODIN_ARCH == .amd64 { foreign import lib "imgui_windows_x64.lib" } else { foreign import lib "imgui_windows_arm64.lib" } }
 else when ODIN_OS == .Linux   { when ODIN_ARCH == .amd64 { foreign import lib "imgui_linux_x64.a" }     else { foreign import lib "imgui_linux_arm64.a" } }
-else when ODIN_OS == .Darwin  { when ODIN_ARCH == .amd64 { foreign import lib "imgui_darwin_x64.a" }    else { foreign import lib "imgui_darwin_arm64.a" } }
+else when ODIN_OS == .Darwin  { when ODIN_ARCH == .amd64 { foreign import lib "imgui_darwin_x64.a" }    else { foreign import lib "imgui_darwin_arm64.a" } }"""
 
-CHECKVERSION :: proc() {
+_header_checkversion = """CHECKVERSION :: proc() {
 	DebugCheckVersionAndDataLayout(VERSION, size_of(IO), size_of(Style), size_of(Vec2), size_of(Vec4), size_of(DrawVert), size_of(DrawIdx))
-}""")
+}"""
+
+def write_header(file: typing.IO):
+	write_line(file, "\n".join(["package imgui", "", _header_c_import, "", _header_stdcpp_import, _header_lib_import, "", _header_checkversion]))
 
 # Pushes a list of field components to the aligned fields, accounting for comments.
 # Attached comments will be included as a field component
 # Preceding comments will be inserted as a "delimiter", which will
 # reset alignment.
 def append_aligned_field(aligned_fields, field_components, comment_parent):
-	comment = comment_parent.get("comments", {})
-	for preceding_comment in comment.get("preceding", []):
+	comment = comment_parent.comments
+	for preceding_comment in comment.preceding:
 		aligned_fields.append(preceding_comment)
 
-	if "attached" in comment: aligned_fields.append(field_components + [" " + comment["attached"]])
-	else:                     aligned_fields.append(field_components)
+	if comment.attached != None: aligned_fields.append(field_components + [" " + comment.attached])
+	else:                        aligned_fields.append(field_components)
 
 # Given a list of fields, write them out aligned
 def _write_aligned_fields_range(file: typing.IO, aligned_fields, indent = 0):
@@ -356,14 +634,14 @@ def _write_aligned_fields_range(file: typing.IO, aligned_fields, indent = 0):
 			column_sizes[component_idx] = max(column_sizes[component_idx], len(component))
 
 	for field in aligned_fields:
-		file.write('\t' * indent)
+		line_components = []
 		for component_idx in range(len(field)):
 			component = field[component_idx]
 			whitespace_amount = column_sizes[component_idx] - len(component)
 			if component_idx == len(field) - 1: whitespace_amount = 0 # Don't pad last element
-			file.write(component + (' ' * whitespace_amount))
+			line_components.append(component + (' ' * whitespace_amount))
 
-		write_line(file)
+		write_line(file, "".join(line_components), indent)
 
 def write_aligned_fields(file: typing.IO, aligned_fields, indent = 0):
 	last_non_delimiter = 0 # Implicit delimiter at start
@@ -424,6 +702,16 @@ _allowed_ifdef = [
 	"ImDrawCallback", # Concrete type overridden by user. Hard to deal with in Odin, so for now should not be set up by user
 ]
 
+# Defines which can be set per configuration, with --config. The bindings are generated as if they
+# were defined in imconfig.h, so the library has to be compiled with the same defines.
+_configurable_defines = [
+	"IMGUI_USE_WCHAR32",
+	"IMGUI_DISABLE_OBSOLETE_FUNCTIONS",
+	"IMGUI_DISABLE_OBSOLETE_KEYIO",
+	"IMGUI_DISABLE_DEBUG_TOOLS",
+	"IMGUI_DISABLE_METRICS_WINDOW",
+]
+
 # Defines to process whatsoever
 _defines_to_process = []
 for define in (_emitted_defines + _allowed_user_defines + _allowed_ifdef):
@@ -431,10 +719,35 @@ for define in (_emitted_defines + _allowed_user_defines + _allowed_ifdef):
 
 # Evaluated define and value
 processed_defines = {}
+# Defines set by the configuration being generated, rather than by the json
+configured_defines = []
+
+# Results of passes_conditionals(), keyed on the conditionals and whether each define they check is defined.
+# Results therefore never go stale when processed_defines changes, and are shared between configurations
+# wherever the defines they depend on are the same.
+_conditionals_cache = {}
+# The defines each set of conditionals checks
+_conditionals_defines = {}
+
+def add_processed_define(name: str, content: str):
+	processed_defines[name] = content
+
+def conditionals_defines(conditionals) -> typing.Tuple[str, ...]:
+	defines = _conditionals_defines.get(conditionals)
+	if defines == None:
+		defines = []
+		for [condition_kind, expression] in conditionals:
+			if condition_kind in ["ifdef", "ifndef"]: defines.append(expression)
+			else:                                     defines += re.findall(r"defined\((\w+)\)", expression)
+		defines = tuple(defines)
+		_conditionals_defines[conditionals] = defines
+
+	return defines
 
 # Checks if define is defined, and make sure that we're allowed to use the define in the first place.
 def _ifdef(define: str) -> bool:
-	if not define in _allowed_ifdef: die("Not allowed to check define '" + define + "'")
+	# Backend headers check their own defines, which are undefined unless the backend lists them, see _backend_bindings
+	if current_backend == None and not define in _allowed_ifdef: die("Not allowed to check define '" + define + "'")
 	return define in processed_defines
 
 # Checks #ifdef/#ifndef, which is simple: we can only have a single string define to check, no expressions
@@ -456,6 +769,9 @@ def _chomp_until(until: str, string: str) -> [str, str, bool]:
 	return [string[pos:], string[:pos+len(until)-1], True]
 
 def condition_if(expression_str) -> bool:
+	# `#if 0`, which backend headers use to hide declarations
+	if expression_str == "0": return False
+
 	# This is hardcoded for the path where we have [optional !, defined(, some_def, ), optional &&] and repeat
 	while len(expression_str) > 0:
 		[expression_str, invert] = _chomp("!", expression_str)
@@ -470,12 +786,20 @@ def condition_if(expression_str) -> bool:
 		if ok: assert len(expression_str) > 0
 
 def passes_conditionals(thing_with_conditionals) -> bool:
-	if not "conditionals" in thing_with_conditionals: return True
+	conditionals = thing_with_conditionals.conditionals
+	if len(conditionals) == 0: return True
 
-	for conditional in thing_with_conditionals["conditionals"]:
-		condition_kind = conditional["condition"]
-		expression = conditional["expression"]
+	key = (conditionals, tuple(define in processed_defines for define in conditionals_defines(conditionals)))
+	passes = _conditionals_cache.get(key)
+	count_cache_lookup("conditional", passes != None)
+	if passes == None:
+		passes = _evaluate_conditionals(conditionals)
+		_conditionals_cache[key] = passes
 
+	return passes
+
+def _evaluate_conditionals(conditionals) -> bool:
+	for [condition_kind, expression] in conditionals:
 		if condition_kind == "ifdef":
 			if not condition_ifdef(expression): return False
 		elif condition_kind == "ifndef":
@@ -500,23 +824,25 @@ def define_strip_prefix(name: str) -> str:
 
 	return name
 
-def parse_and_write_defines(file: typing.IO, defines):
+def parse_and_write_defines(file: typing.IO, defines: typing.List[Define]):
 	write_section(file, "Defines")
 	aligned = []
 
 	for define in defines:
-		if not define["name"] in _defines_to_process: continue
-		is_user_define = not define["source_location"]["filename"].endswith("imgui.h")
+		if not define.name in _defines_to_process: continue
 		if not passes_conditionals(define): continue
 
-		if is_user_define:
-			if not define["name"] in _allowed_user_defines: die("Disallowed user define '" + define["name"] + "'")
+		# Already set by the configuration, see generate_bindings()
+		if define.name in configured_defines: continue
+
+		if define.is_user_define:
+			if not define.name in _allowed_user_defines: die("Disallowed user define '" + define.name + "'")
 
-		if define["name"] in processed_defines: die("Define '" + define["name"] + "' already defined! This is almost certainly not correct")
-		processed_defines[define["name"]] = define.get("content", "")
+		if define.name in processed_defines: die("Define '" + define.name + "' already defined! This is almost certainly not correct")
+		add_processed_define(define.name, define.content if define.content != None else "")
 
-		if define["name"] in _emitted_defines:
-			append_aligned_field(aligned, [define_strip_prefix(define["name"]), f' :: {define.get("content", "true")}'], define)
+		if define.name in _emitted_defines:
+			append_aligned_field(aligned, [define_strip_prefix(define.name), f' :: {define.content if define.content != None else "true"}'], define)
 
 	write_aligned_fields(file, aligned)
 
@@ -569,16 +895,16 @@ def enum_parse_flag_combination(value: str, expected_prefix: str) -> typing.List
 
 	return combined_enums
 
-def write_enum_as_flags(file, enum, enum_field_prefix, name):
+def write_enum_as_flags(file, enum: Enum, enum_field_prefix, name):
 
 	aligned_enums = []
 	aligned_flags = []
 
-	for element in enum["elements"]:
+	for element in enum.elements:
 		if not passes_conditionals(element): continue
 
-		element_entire_name = element["name"]
-		element_value = element["value_expression"]
+		element_entire_name = element.name
+		element_value = element.value_expression
 		element_name = enum_parse_field_name(element_entire_name, enum_field_prefix)
 		handled = False # To catch missed cases
 
@@ -616,17 +942,17 @@ def write_enum_as_flags(file, enum, enum_field_prefix, name):
 	write_aligned_fields(file, aligned_flags, 0)
 	write_line(file)
 
-def write_enum_as_constants(file, enum, enum_field_prefix, name):
+def write_enum_as_constants(file, enum: Enum, enum_field_prefix, name):
 	write_line_with_comments(file, f'{name} :: distinct c.int', enum)
 
 	aligned = []
 
-	for element in enum["elements"]:
+	for element in enum.elements:
 		if not passes_conditionals(element): continue
 
-		field_base_name = element["name"]
+		field_base_name = element.name
 		field_name = enum_parse_field_name(field_base_name, enum_field_prefix)
-		field_value = element["value_expression"]
+		field_value = element.value_expression
 
 		field_value_evald = try_eval(field_value)
 		if field_value_evald != None:
@@ -639,15 +965,15 @@ def write_enum_as_constants(file, enum, enum_field_prefix, name):
 	write_aligned_fields(file, aligned)
 	write_line(file)
 
-def write_enum(file: typing.IO, enum, enum_field_prefix: str, name: str, stop_after: str):
+def write_enum(file: typing.IO, enum: Enum, enum_field_prefix: str, name: str, stop_after: str):
 	write_line(file, f'{name} :: enum c.int {{')
 
 	stop_comment = ""
 
-	for element in enum["elements"]:
+	for element in enum.elements:
 		if not passes_conditionals(element): continue
 
-		field_base_name = element["name"]
+		field_base_name = element.name
 		# SEE: _imgui_enum_stop_after
 		if field_base_name == stop_after:
 			stop_comment = "// "
@@ -657,8 +983,8 @@ def write_enum(file: typing.IO, enum, enum_field_prefix: str, name: str, stop_af
 		field_name = enum_parse_field_name(field_base_name, enum_field_prefix)
 		field_name = make_identifier_valid(field_name)
 
-		if "value_expression" in element:
-			base_value = element["value_expression"]
+		if element.value_expression != None:
+			base_value = element.value_expression
 			value = enum_parse_value(base_value, name, enum_field_prefix)
 			write_line(file, f'\t{stop_comment}{field_name} = {value},')
 		else:
@@ -694,14 +1020,14 @@ _imgui_enum_stop_after = {
 	"ImGuiCol_": "ImGuiCol_TabActive",
 }
 
-def write_enums(file: typing.IO, enums):
+def write_enums(file: typing.IO, enums: typing.List[Enum]):
 	write_section(file, "Enums")
 	for enum in enums:
 		if not passes_conditionals(enum): continue
 
 		# enum_field_prefix is the prefix expected on each field
 		# name is the actual name of the enum
-		entire_name = enum["name"]
+		entire_name = enum.name
 		[enum_field_prefix, name] = enum_parse_name(entire_name)
 
 		if entire_name in _imgui_enum_skip: continue
@@ -735,12 +1061,85 @@ _imgui_struct_field_name_override = {
 	"ID": "_ID",
 }
 
-def write_structs(file: typing.IO, structs):
+# Returns the Odin type of the elements of an ImVector instantiation, eg. ImVector_ImDrawCmd -> DrawCmd.
+# Returns None if `struct` isn't an ImVector.
+def vector_element_type(struct: Struct) -> str:
+	if not struct.name.startswith("ImVector_"): return None
+
+	fields = dict((field.name, field) for field in struct.fields if passes_conditionals(field))
+	if not "Size" in fields or not "Data" in fields: return None
+
+	data_type = fields["Data"].type.odin
+	if data_type.startswith("^"): return data_type.removeprefix("^")
+
+	# Pointers to some types are written as another type, eg. ImVector_char's char* as cstring, see _pointer_aliases
+	for [pointed_type, alias] in _pointer_aliases.items():
+		if data_type == alias and pointed_type != "void": return make_type_odiney(pointed_type)
+
+	die(f"Can't tell the element type of {struct.name}, from its Data field of type {data_type}")
+
+def write_vector_slices(file: typing.IO, vectors: typing.List[typing.List[str]]):
+	""" Writes a proc returning a slice aliasing the data of each [vector name, element type] in `vectors`,
+	and groups them into `Vector_Slice` """
+	if len(vectors) == 0: return
+
+	write_line(file, "// Slices aliasing the contents of an ImVector, eg. `for cmd in Vector_Slice(&draw_list.CmdBuffer)`.")
+	write_line(file, "// The slice is only valid until the vector is next modified.")
+	aligned = []
+	for [name, element_type] in vectors:
+		aligned.append([f"{name}_Slice", f' :: #force_inline proc "contextless" (vector: ^{name}) -> []{element_type}', f" {{ return ([^]{element_type})(vector.Data)[:vector.Size] }}"])
+	write_aligned_fields(file, aligned)
+	write_line(file)
+
+	write_line(file, "Vector_Slice :: proc {")
+	for [name, _element_type] in vectors:
+		write_line(file, f"{name}_Slice,", 1)
+	write_line(file, "}")
+
+# How many bits bitfields of each type can hold, before the next one starts a new unit
+_bit_field_backing_bits = {
+	"bool":     8,
+	"c.char":   8,
+	"c.uchar":  8,
+	"i8":       8,
+	"u8":       8,
+	"c.short":  16,
+	"c.ushort": 16,
+	"i16":      16,
+	"u16":      16,
+	"c.int":    32,
+	"c.uint":   32,
+	"i32":      32,
+	"u32":      32,
+}
+
+def split_bit_fields(fields: typing.List[Field]) -> typing.List[typing.List[Field]]:
+	""" Splits consecutive bitfields which share a storage unit in C into runs, eg. `unsigned int A : 1; unsigned int B : 31;`.
+	Every other field is a run of its own. """
+	runs = []
+	used_bits = 0
+	for field in fields:
+		if field.width == None:
+			runs.append([field])
+			continue
+
+		backing_bits = _bit_field_backing_bits.get(field.type.odin, 32)
+		previous = runs[-1][-1] if len(runs) > 0 else None
+		if previous == None or previous.width == None or previous.type.odin != field.type.odin or used_bits + field.width > backing_bits:
+			runs.append([])
+			used_bits = 0
+		runs[-1].append(field)
+		used_bits += field.width
+
+	return runs
+
+def write_structs(file: typing.IO, structs: typing.List[Struct]):
 	write_section(file, "Structs")
+	vectors = [] # [name, element type]
 	for struct in structs:
 		if not passes_conditionals(struct): continue
 
-		entire_name = struct["name"]
+		entire_name = struct.name
 
 		if entire_name in _imgui_struct_override:
 			write_line(file, _imgui_struct_override[entire_name])
@@ -748,44 +1147,60 @@ def write_structs(file: typing.IO, structs):
 
 		name = strip_imgui_branding(entire_name)
 
-		write_line_with_comments(file, f'{name} :: struct {{', struct)
-		field_components = []
-		for field in struct["fields"]:
-			if not passes_conditionals(field): continue
+		element_type = vector_element_type(struct)
+		if element_type != None: vectors.append([name, element_type])
 
-			adjusted_name = apply_override(field["name"], _imgui_struct_field_name_override)
-			field_type = parse_type(field["type"])
-			append_aligned_field(field_components, [f'{adjusted_name}: ', f'{field_type},'], field)
+		write_line_with_comments(file, f'{name} :: struct {"#raw_union " if struct.is_union else ""}{{', struct)
+		field_components = []
+		fields = [field for field in struct.fields if passes_conditionals(field)]
+		for run in split_bit_fields(fields):
+			if run[0].width == None:
+				field = run[0]
+				adjusted_name = apply_override(field.name, _imgui_struct_field_name_override)
+				append_aligned_field(field_components, [f'{adjusted_name}: ', f'{field.type.odin},'], field)
+				continue
+
+			# Bitfields sharing a unit become an Odin bit_field, which `using` makes look like the C struct
+			write_aligned_fields(file, field_components, 1)
+			field_components = []
+			write_line(file, f"using _: bit_field {run[0].type.odin} {{", 1)
+			bit_components = []
+			for field in run:
+				adjusted_name = apply_override(field.name, _imgui_struct_field_name_override)
+				append_aligned_field(bit_components, [f'{adjusted_name}: ', f'{field.type.odin} | {field.width},'], field)
+			write_aligned_fields(file, bit_components, 2)
+			write_line(file, "},", 1)
 
 		write_aligned_fields(file, field_components, 1)
 
 		write_line(file, "}")
 		write_line(file)
 
+	write_vector_slices(file, vectors)
+
 # FUNCTIONS
-def function_to_string(function, as_type=True) -> str:
+def function_to_string(function: Function, as_type=True, kept_names: typing.List[str] = []) -> str:
+	""" `kept_names` are arguments which keep their name from C, rather than going through make_identifier_valid """
 	proc_decl = 'proc "c" (' if as_type else "proc("
 
 	argument_list = []
-	arguments = function["arguments"]
+	arguments = function.arguments
 
 	for argument_idx in range(len(arguments)):
 		argument = arguments[argument_idx]
 
 		argument_type = "no type yet :)"
-		argument_is_varargs = argument["is_varargs"]
-		argument_name = argument["name"]
+		argument_name = argument.name
 
-		if argument_is_varargs:
+		if argument.is_varargs:
 			argument_name = "#c_vararg args"
 			argument_type = "..any"
 		else:
-			argument_name = make_identifier_valid(argument_name)
-			argument_type = parse_type(argument["type"], in_function=True)
+			if not argument_name in kept_names: argument_name = make_identifier_valid(argument_name)
+			argument_type = argument.type.odin
 
-		default_value = None
-		if "default_value" in argument:
-			default_value = make_value_odiney(argument["default_value"], argument_type)
+		default_value = argument.default_value
+		if default_value != None:
 			assert not as_type, "Not possible to have default args in type!"
 
 		if default_value: argument_list.append(f'{argument_name}: {argument_type} = {default_value}')
@@ -795,25 +1210,25 @@ def function_to_string(function, as_type=True) -> str:
 
 	proc_decl += ")"
 
-	return_type = parse_type(function["return_type"])
+	return_type = function.return_type.odin
 	if return_type != "void":
 		proc_decl += f' -> {return_type}'
 
 	return proc_decl
 
-def function_uses_va_list(function) -> bool:
-	arguments = function["arguments"]
+def function_uses_va_list(function: Function) -> bool:
+	arguments = function.arguments
 
 	if len(arguments) == 0:
 		return False
 
 	last_arg = arguments[len(arguments) - 1]
 
-	if last_arg["is_varargs"]:
+	if last_arg.is_varargs:
 		# These don't have a type field
 		return False
 
-	return last_arg["type"]["declaration"] == "va_list"
+	return last_arg.type.declaration == "va_list"
 
 _imgui_functions_skip = [
 	# Returns ImStr, which isn't defined anywhere?
@@ -823,46 +1238,330 @@ _imgui_functions_skip = [
 
 _imgui_function_prefixes = ["ImGui_", "ImGui", "Im"]
 
-# Functions which have a corresponding default argument helper. Functions in this
-# list will all end in Ex, which should be stripped.
-_imgui_extended_arg_funcs = []
+# Functions which have a corresponding default argument helper, as a dict of their name to the helper's.
+# These all end in Ex, which is stripped, and are bound in place of the helper, with Odin default values
+# standing in for the C++ ones. Calls then go straight to the full-argument entry point.
+_imgui_extended_arg_funcs = {}
 
-def find_default_arg_funcs(functions):
+# Helpers which had to be kept, as their Ex function isn't bound. Listed in the helper report.
+kept_default_arg_helpers = []
+
+def function_is_bound(function: Function) -> bool:
+	""" Whether `function` gets a foreign proc. Default argument helpers aside, which depend on their Ex function. """
+	if function.name in _imgui_functions_skip: return False
+	if not passes_conditionals(function): return False
+	return not function_uses_va_list(function)
+
+def find_default_arg_funcs(functions: typing.List[Function]):
+	bound_names = set(function.name for function in functions if function_is_bound(function))
 	for function in functions:
-		if function["is_default_argument_helper"]:
-			_imgui_extended_arg_funcs.append(function["name"] + "Ex")
+		if not function.is_default_argument_helper or not function.name in bound_names: continue
 
-def function_has_default_args(function) -> bool:
-	for argument in function["arguments"]:
-		if "default_value" in argument:
+		if function.name + "Ex" in bound_names:
+			_imgui_extended_arg_funcs[function.name + "Ex"] = function.name
+		else:
+			kept_default_arg_helpers.append(function.name)
+
+def function_has_default_args(function: Function) -> bool:
+	for argument in function.arguments:
+		if argument.default_value != None:
 			return True
 
 	return False
 
-def write_functions(file: typing.IO, functions):
+def function_odin_name(function: Function) -> str:
+	[_prefix, remainder] = strip_list(function.name, _imgui_function_prefixes)
+
+	if function.name in _imgui_extended_arg_funcs:
+		remainder = strip_suffix("Ex", remainder)
+
+	return remainder
+
+# STRING OVERLOADS
+# Procs taking `const char*` get an overload taking `string` instead, so callers don't have to allocate a C string.
+# Where the C function takes a (begin, end) pair, the string is passed as is. Otherwise it's copied into a
+# scratch buffer, and the space is given back when the overload returns. Overloads called while another one is
+# running, eg. from an InputText callback, add to the buffer instead of overwriting the outer overload's strings.
+
+_string_overload_suffix = "String"
+
+_string_overload_helpers = """// Used by the String overloads below, to pass Odin strings without allocating
+@(private)
+_empty_cstring: cstring = ""
+
+@(private)
+string_begin :: #force_inline proc "contextless" (s: string) -> cstring {
+	if len(s) == 0 { return _empty_cstring }
+	return cstring(raw_data(s))
+}
+
+@(private)
+string_end :: #force_inline proc "contextless" (s: string) -> cstring {
+	if len(s) == 0 { return _empty_cstring }
+	return cstring(raw_data(s)[len(s):])
+}
+
+@(private, thread_local)
+_scratch_buffer: [4096]u8
+@(private, thread_local)
+_scratch_used: int
+
+// Copies `s` into the scratch buffer, NUL terminated. Strings which don't fit go in the temp allocator.
+// The result is valid until the String overload which copied it returns, and gives back the space.
+@(private)
+scratch_cstring :: proc(s: string) -> cstring {
+	if _scratch_used + len(s) + 1 > len(_scratch_buffer) {
+		buffer := make([]u8, len(s) + 1, context.temp_allocator)
+		copy(buffer, s)
+		return cstring(raw_data(buffer))
+	}
+
+	start := _scratch_used
+	copy(_scratch_buffer[start:], s)
+	_scratch_buffer[start + len(s)] = 0
+	_scratch_used += len(s) + 1
+	return cstring(raw_data(_scratch_buffer[start:]))
+}"""
+
+def argument_is_const_string(argument: Argument) -> bool:
+	return not argument.is_varargs and argument.type.declaration == "const char*"
+
+# `text` and `text_begin` both pair up with `text_end`
+def string_pair_end_name(begin_name: str) -> str:
+	return begin_name.removesuffix("_begin") + "_end"
+
+def string_overload_lines(function: Function, odin_name: str, call_name: str) -> typing.List[str]:
+	""" Returns the lines of the String overload of `function`, or None if it doesn't take any strings.
+	The overload is named after `odin_name`, and calls `call_name`, which differ when the function is in a proc group. """
+	arguments = function.arguments
+	if any(argument.is_varargs for argument in arguments): return None
+
+	parameters = []
+	call_arguments = []
+	uses_scratch = False
+	takes_string = False
+
+	argument_idx = 0
+	while argument_idx < len(arguments):
+		argument = arguments[argument_idx]
+		name = make_identifier_valid(argument.name)
+		next_argument = arguments[argument_idx + 1] if argument_idx + 1 < len(arguments) else None
+		default = f" = {argument.default_value}" if argument.default_value != None else ""
+
+		if argument_is_const_string(argument) and next_argument != None and argument_is_const_string(next_argument) and next_argument.name == string_pair_end_name(argument.name):
+			name = make_identifier_valid(argument.name.removesuffix("_begin"))
+			parameters.append(f"{name}: string")
+			call_arguments += [f"string_begin({name})", f"string_end({name})"]
+			takes_string = True
+			argument_idx += 2
+			continue
+
+		# Defaulting to NULL usually means something different from "", so these stay as they are
+		if argument_is_const_string(argument) and argument.default_value != "nil":
+			parameters.append(f"{name}: string{default}")
+			call_arguments.append(f"scratch_cstring({name})")
+			takes_string = True
+			uses_scratch = True
+		else:
+			parameters.append(f"{name}: {argument.type.odin}{default}")
+			call_arguments.append(name)
+		argument_idx += 1
+
+	if not takes_string: return None
+
+	return_type = function.return_type.odin
+	return_decl = f" -> {return_type}" if return_type != "void" else ""
+	call = f'{call_name}({", ".join(call_arguments)})'
+
+	lines = [f'{odin_name}{_string_overload_suffix} :: proc({", ".join(parameters)}){return_decl} {{']
+	if uses_scratch: lines += ["\tmark := _scratch_used", "\tdefer _scratch_used = mark"]
+	lines.append(f"\treturn {call}" if return_decl != "" else f"\t{call}")
+	lines.append("}")
+	return lines
+
+# PROC GROUPS
+# C++ overloads get a suffix in C, eg. GetColorU32, GetColorU32ImVec4 and GetColorU32ImU32. These are put back
+# together in a proc group with the C++ name. The member which had that name gets _proc_group_base_suffix.
+
+_proc_group_base_suffix = "Base"
+
+# Types which aren't distinct in Odin, so overloads taking either can't be told apart
+_identical_odin_types = {
+	"c.char":      "u8",
+	"c.uchar":     "u8",
+	"c.short":     "i16",
+	"c.ushort":    "u16",
+	"c.int":       "i32",
+	"c.uint":      "u32",
+	"c.longlong":  "i64",
+	"c.ulonglong": "u64",
+	"ID":          "u32",
+	"KeyChord":    "i32",
+	"DrawIdx":     "u16",
+}
+
+def overload_signature(function: Function) -> typing.Tuple[str, ...]:
+	return tuple(re.sub(r"[\w.]+", lambda match: _identical_odin_types.get(match.group(0), match.group(0)), argument.type.odin) for argument in function.arguments)
+
+# [group name, [member names]] of the groups written, listed in the helper report
+generated_proc_groups = []
+
+def find_proc_groups(written_functions: typing.List[typing.List]) -> typing.List[typing.List]:
+	""" Given [function, odin name] of the bound functions, returns [group name, [member names]] for each set of
+	overloads which can be a proc group. The first member is the renamed one, which used to have the group's name. """
+	written_names = set(odin_name for [_function, odin_name] in written_functions)
+	overload_sets = {}
+	for [function, odin_name] in written_functions:
+		if function.original_name == None: continue
+		overload_sets.setdefault(function.original_name, []).append([function, odin_name])
+
+	groups = []
+	for [original_name, overloads] in overload_sets.items():
+		if len(overloads) < 2: continue
+
+		[_prefix, group_name] = strip_list(original_name.replace("::", "_"), _imgui_function_prefixes)
+		base_name = group_name + _proc_group_base_suffix
+		if base_name in written_names: continue
+		# C varargs can't be told apart from other overloads reliably, so those stay out of the group
+		overloads = [[function, odin_name] for [function, odin_name] in overloads if not any(argument.is_varargs for argument in function.arguments)]
+		if not group_name in [odin_name for [_function, odin_name] in overloads] or len(overloads) < 2: continue
+		# Overloads which only differed in C++ types which are the same in Odin (eg. ImU32 and ImGuiID) would be ambiguous
+		signatures = set(overload_signature(function) for [function, _odin_name] in overloads)
+		if len(signatures) != len(overloads): continue
+
+		members = [base_name] + [odin_name for [_function, odin_name] in overloads if odin_name != group_name]
+		groups.append([group_name, members])
+
+	generated_proc_groups.extend(groups)
+	return groups
+
+# INLINE PROCS
+# Small functions which would cost more to call across the FFI boundary than to run. These are written in Odin,
+# ported from imgui.cpp/imgui_draw.cpp so that they give bit for bit the same results, and force inlined.
+# Each entry is the C function name: [argument names the body expects, body]. If the arguments differ, as
+# dear_bindings or imgui changed, the function is bound as usual. `FOREIGN` in a body is the C function,
+# which is then still bound, privately, for the slow path.
+
+_inline_function_bodies = {
+	"ImGui_ColorConvertU32ToFloat4": [["in"], """
+	s :: f32(1.0) / 255.0
+	return {f32((_in >> 0) & 0xFF) * s, f32((_in >> 8) & 0xFF) * s, f32((_in >> 16) & 0xFF) * s, f32((_in >> 24) & 0xFF) * s}"""],
+
+	"ImGui_ColorConvertFloat4ToU32": [["in"], """
+	// IM_F32_TO_INT8_SAT
+	to_u8 :: #force_inline proc "contextless" (f: f32) -> u32 { return u32(i32((0 if f < 0 else 1 if f > 1 else f) * 255 + 0.5)) }
+	return to_u8(_in.x) << 0 | to_u8(_in.y) << 8 | to_u8(_in.z) << 16 | to_u8(_in.w) << 24"""],
+
+	"ImGui_ColorConvertRGBtoHSV": [["r", "g", "b", "out_h", "out_s", "out_v"], """
+	r, g, b := r, g, b
+	K: f32 = 0
+	if g < b {
+		g, b = b, g
+		K = -1
+	}
+	if r < g {
+		r, g = g, r
+		K = -2.0 / 6.0 - K
+	}
+	chroma := r - (g if g < b else b)
+	out_h^ = abs(K + (g - b) / (6 * chroma + 1e-20))
+	out_s^ = chroma / (r + 1e-20)
+	out_v^ = r"""],
+
+	"ImGui_ColorConvertHSVtoRGB": [["h", "s", "v", "out_r", "out_g", "out_b"], """
+	if s == 0 {
+		out_r^, out_g^, out_b^ = v, v, v
+		return
+	}
+	// ImFmod(h, 1). Exact for the values which have a fraction, the rest are whole (or inf/nan).
+	h := h
+	h = (h - f32(i32(h)) if abs(h) < 1 << 23 else h * 0) / (60.0 / 360.0)
+	i := i32(h)
+	f := h - f32(i)
+	p := v * (1 - s)
+	q := v * (1 - s * f)
+	t := v * (1 - s * (1 - f))
+	switch i {
+	case 0:  out_r^, out_g^, out_b^ = v, t, p
+	case 1:  out_r^, out_g^, out_b^ = q, v, p
+	case 2:  out_r^, out_g^, out_b^ = p, v, t
+	case 3:  out_r^, out_g^, out_b^ = p, q, v
+	case 4:  out_r^, out_g^, out_b^ = t, p, v
+	case:    out_r^, out_g^, out_b^ = v, p, q
+	}"""],
+
+	"ImDrawList_PathClear": [["self"], """
+	self._Path.Size = 0"""],
+
+	# Growing the vector allocates through imgui, so that's left to C
+	"ImDrawList_PathLineTo": [["self", "pos"], """
+	if self._Path.Size == self._Path.Capacity {
+		FOREIGN(self, pos)
+		return
+	}
+	([^]Vec2)(self._Path.Data)[self._Path.Size] = pos
+	self._Path.Size += 1"""],
+
+	"ImDrawList_PathLineToMergeDuplicate": [["self", "pos"], """
+	path := ([^]Vec2)(self._Path.Data)
+	if self._Path.Size > 0 && transmute([2]u32)path[self._Path.Size - 1] == transmute([2]u32)pos do return
+	if self._Path.Size == self._Path.Capacity {
+		FOREIGN(self, pos)
+		return
+	}
+	path[self._Path.Size] = pos
+	self._Path.Size += 1"""],
+}
+
+def inline_function_body(function: Function) -> str:
+	""" Returns the Odin body of `function` from _inline_function_bodies, or None if it's bound as a foreign proc """
+	entry = _inline_function_bodies.get(function.name)
+	if entry == None: return None
+	[argument_names, body] = entry
+	if argument_names != [argument.name for argument in function.arguments]:
+		print(f"Warning: Arguments of {function.name} changed, it won't be inlined")
+		return None
+	return body
+
+def foreign_name_of_inlined(odin_name: str) -> str:
+	return "_" + odin_name
+
+def write_functions(file: typing.IO, functions: typing.List[Function]):
 	write_section(file, "Functions")
 	write_line(file, "foreign lib {")
 
 	find_default_arg_funcs(functions)
 
 	aligned = []
+	written_functions = [] # [function, odin name]
 
 	for function in functions:
-		entire_name = function["name"]
-
-		if entire_name in _imgui_functions_skip: continue
-		if not passes_conditionals(function): continue
-		if function_uses_va_list(function): continue
-		if function["is_default_argument_helper"]: continue
-
-		[_prefix, remainder] = strip_list(entire_name, _imgui_function_prefixes)
-
-		if entire_name in _imgui_extended_arg_funcs:
-			remainder = strip_suffix("Ex", remainder)
+		if not function_is_bound(function): continue
+		if function.is_default_argument_helper and not function.name in kept_default_arg_helpers: continue
+		written_functions.append([function, function_odin_name(function)])
+
+	# The member of an overload set which has the set's name gives it up to the proc group
+	proc_groups = find_proc_groups(written_functions)
+	renamed = {}
+	for [group_name, members] in proc_groups:
+		renamed[group_name] = members[0]
+
+	inlined = [] # [function, odin name, body]
+	for [function, odin_name] in written_functions:
+		entire_name = function.name
+		remainder = renamed.get(odin_name, odin_name)
+		link_attributes = ""
+
+		body = inline_function_body(function)
+		if body != None:
+			inlined.append([function, remainder, body])
+			if not "FOREIGN" in body: continue
+			remainder = foreign_name_of_inlined(remainder)
+			link_attributes = ", private"
 
 		aligned_components = []
 
-		aligned_components.append(f'@(link_name="{entire_name}") ')
+		aligned_components.append(f'@(link_name="{entire_name}"{link_attributes}) ')
 		aligned_components.append(remainder)
 		aligned_components.append(f' :: {function_to_string(function, False)}')
 		aligned_components.append(" ---")
@@ -873,6 +1572,38 @@ def write_functions(file: typing.IO, functions):
 
 	write_line(file, "}")
 
+	if len(inlined) > 0:
+		write_line(file)
+		write_line(file, "// Written in Odin, so they can be inlined. See _inline_function_bodies in gen_odin.py.")
+		for [function, odin_name, body] in inlined:
+			if function != inlined[0][0]: write_line(file)
+			signature = function_to_string(function, False).removeprefix("proc")
+			write_line(file, f'{odin_name} :: #force_inline proc "contextless" {signature} {{{body.replace("FOREIGN", foreign_name_of_inlined(odin_name))}')
+			write_line(file, "}")
+
+	if len(proc_groups) > 0:
+		write_line(file)
+		write_line(file, "// Overloads from imgui.h, which are separate functions in C")
+		for [group_name, members] in proc_groups:
+			write_line(file, f'{group_name} :: proc{{{", ".join(members)}}}')
+
+	written_names = set(odin_name for [_function, odin_name] in written_functions)
+	string_overloads = []
+	for [function, odin_name] in written_functions:
+		lines = string_overload_lines(function, odin_name, renamed.get(odin_name, odin_name))
+		if lines == None: continue
+		# Don't shadow a proc which already has this name
+		if odin_name + _string_overload_suffix in written_names: continue
+		string_overloads.append(lines)
+
+	# The helpers go with the overloads, so they're only written where they're used
+	if len(string_overloads) > 0:
+		write_line(file)
+		write_line(file, _string_overload_helpers)
+	for lines in string_overloads:
+		write_line(file)
+		for line in lines: write_line(file, line)
+
 # TYPEDEFS
 
 _imgui_allowed_typedefs = [
@@ -899,24 +1630,647 @@ _imgui_typedef_overrides = {
 	"ImWchar32": "rune",
 }
 
-def write_typedefs(file: typing.IO, typedefs):
+def write_typedefs(file: typing.IO, typedefs: typing.List[Typedef]):
 	write_section(file, "Typedefs")
 	aligned = []
 
 	for typedef in typedefs:
 		if not passes_conditionals(typedef): continue
 
-		entire_name = typedef["name"]
+		entire_name = typedef.name
 
 		if entire_name in _imgui_typedef_overrides:
 			append_aligned_field(aligned, [strip_imgui_branding(entire_name), f' :: {_imgui_typedef_overrides[entire_name]}'], typedef)
 			continue
 
 		if not entire_name in _imgui_allowed_typedefs: continue
-		append_aligned_field(aligned, [strip_imgui_branding(entire_name), f' :: {parse_type(typedef["type"])}'], typedef)
+		append_aligned_field(aligned, [strip_imgui_branding(entire_name), f' :: {typedef.type.odin}'], typedef)
 
 	write_aligned_fields(file, aligned)
 
+# Returns [name, writer, items] for each section, in the order they have to be written in
+def bindings_sections(bindings: Bindings) -> typing.List[typing.List]:
+	return [
+		["defines",   parse_and_write_defines, bindings.defines],
+		["enums",     write_enums,             bindings.enums],
+		["structs",   write_structs,           bindings.structs],
+		["functions", write_functions,         bindings.functions],
+		["typedefs",  write_typedefs,          bindings.typedefs],
+		["layout",    write_layout,            bindings.structs],
+	]
+
+def write_bindings(file: typing.IO, bindings: Bindings):
+	write_header(file)
+	for [_name, writer, items] in bindings_sections(bindings):
+		writer(file, items)
+
+# LAYOUT
+# With --layout-probe, a C program is written which prints the size of every struct in c_imgui.h, and the offset
+# of every field. build.py compiles and runs it, and passes what it printed back with --layout. The bindings then
+# #assert that the Odin structs match, so a struct which is wrong fails to compile, instead of corrupting memory.
+
+# Loaded from --layout: {"os": ODIN_OS, "arch": ODIN_ARCH, "structs": {name: {"size": size, "offsets": {field: offset}}}}
+struct_layout = None
+
+_probe_conditions = {
+	"ifdef":  "#ifdef {}",
+	"ifndef": "#ifndef {}",
+	"if":     "#if {}",
+	"ifnot":  "#if !({})",
+}
+
+def probe_conditionals_lines(conditionals, line: str) -> typing.List[str]:
+	""" Wraps `line` in the conditionals it has in c_imgui.h, so the probe only looks at what's there """
+	return [_probe_conditions[kind].format(expression) for [kind, expression] in conditionals] + [line] + ["#endif"] * len(conditionals)
+
+def field_is_probed(field: Field) -> bool:
+	# offsetof() doesn't work on bitfields, and anonymous fields are named by dear_bindings, they have no name in C
+	return field.width == None and not field.name.startswith("__anonymous")
+
+def layout_probe_source(structs: typing.List[Struct]) -> str:
+	""" Returns the source of the layout probe. It prints a line per struct, `struct NAME SIZE`, and a line per field, `field STRUCT NAME OFFSET`. """
+	lines = [
+		"// Generated by gen_odin.py --layout-probe, see gen_odin.py",
+		"#include <stddef.h>",
+		"#include <stdio.h>",
+		'#include "c_imgui.h"',
+		"",
+		"int main(void)",
+		"{",
+	]
+
+	for struct in structs:
+		# Opaque and anonymous structs have no size to take
+		if struct.is_anonymous or struct.name.startswith("__anonymous") or len(struct.fields) == 0: continue
+
+		struct_lines = [f'printf("struct {struct.name} %u\\n", (unsigned)sizeof({struct.name}));']
+		for field in struct.fields:
+			if not field_is_probed(field): continue
+			struct_lines += probe_conditionals_lines(field.conditionals, f'printf("field {struct.name} {field.name} %u\\n", (unsigned)offsetof({struct.name}, {field.name}));')
+
+		for line in probe_conditionals_lines(struct.conditionals, "{"):
+			if line == "{":
+				lines += ["\t{"] + ["\t\t" + struct_line if not struct_line.startswith("#") else struct_line for struct_line in struct_lines] + ["\t}"]
+			else:
+				lines.append(line)
+
+	return "\n".join(lines + ["\treturn 0;", "}"]) + "\n"
+
+def write_layout(file: typing.IO, structs: typing.List[Struct]):
+	# The layout is measured without any of the defines a configuration can set
+	if struct_layout == None or len(configured_defines) > 0: return
+
+	write_section(file, "Layout")
+	write_line(file, "// Measured from c_imgui.h by build.py. If one of these fails, that struct doesn't match imgui's, and would corrupt memory.")
+	write_line(file, f'when ODIN_OS == .{struct_layout["os"]} && ODIN_ARCH == .{struct_layout["arch"]} {{')
+	for struct in structs:
+		if not passes_conditionals(struct): continue
+		layout = struct_layout["structs"].get(struct.name)
+		if layout == None: continue
+
+		name = strip_imgui_branding(struct.name)
+		write_line(file, f'#assert(size_of({name}) == {layout["size"]})', 1)
+		if struct.name in _imgui_struct_override: continue
+
+		for field in struct.fields:
+			if not passes_conditionals(field) or not field.name in layout["offsets"]: continue
+			write_line(file, f'#assert(offset_of({name}, {apply_override(field.name, _imgui_struct_field_name_override)}) == {layout["offsets"][field.name]})', 1)
+	write_line(file, "}")
+
+# SPLIT FILES
+
+def split_file_name(destination_file: str, section: str) -> str:
+	""" Where `section` goes when split into multiple files, eg. imgui.odin -> imgui_enums.odin. The header keeps the original name. """
+	if section == "": return destination_file
+	[stem, extension] = path.splitext(destination_file)
+	return f"{stem}_{section}{extension}"
+
+def generate_split_bindings(bindings: Bindings, defines: typing.List[str] = []) -> typing.List[typing.List[str]]:
+	""" Like generate_bindings(), but returns [section, contents] for a file per section, plus the header (section ""),
+	so that regenerating only touches the files whose sections changed. """
+	start_configuration(defines)
+
+	files = [["", "\n".join(["package imgui", "", _header_stdcpp_import, "", _header_checkversion]) + "\n"]]
+	for [name, writer, items] in bindings_sections(bindings):
+		output = io.StringIO()
+		writer(output, items)
+		section_text = output.getvalue()
+		if section_text == "": continue
+
+		# Imports are per file in Odin, and unused imports are an error with -vet
+		imports = []
+		if re.search(r"\bc\.", section_text) != None: imports += [_header_c_import, ""]
+		if name == "functions":                       imports += [_header_lib_import, ""]
+
+		files.append([name, "\n".join(["package imgui", ""] + imports) + section_text])
+
+	return files
+
+# CONFIGURATIONS
+
+# Splits generated bindings into the pieces which can be put in a `when` block: top level declarations,
+# and the procs in the foreign block. Returns a list of [lines, in_foreign_block].
+def split_declarations(bindings_text: str) -> typing.List[typing.List]:
+	declarations = []
+	current = []
+	depth = 0
+	in_foreign_block = False
+
+	for line in bindings_text.splitlines():
+		if in_foreign_block:
+			# Procs are always a single line
+			if line == "}":
+				in_foreign_block = False
+			declarations.append([line, in_foreign_block])
+			continue
+
+		if depth == 0 and line.startswith("foreign lib {"):
+			declarations.append([line, False])
+			in_foreign_block = True
+			continue
+
+		code = line.split("//")[0]
+		depth += code.count("{") - code.count("}")
+		current.append(line)
+		if depth == 0:
+			declarations.append(["\n".join(current), False])
+			current = []
+
+	assert depth == 0 and len(current) == 0, "Unbalanced braces in generated bindings"
+	return declarations
+
+def merge_configurations(configuration_texts: typing.List[typing.List[str]], declare_config: bool = True) -> str:
+	""" Given [name, bindings text] for each configuration, returns one file, where everything which isn't the same
+	in every configuration is wrapped in `when IMGUI_CONFIG == "name"`. The first configuration is the default.
+	IMGUI_CONFIG is declared in the file if `declare_config`, which should only be one file when split into several. """
+	names = [name for [name, _text] in configuration_texts]
+
+	# [declaration, in_foreign_block, names of the configurations it's in]
+	merged = [[text, in_foreign_block, [names[0]]] for [text, in_foreign_block] in split_declarations(configuration_texts[0][1])]
+
+	for [name, text] in configuration_texts[1:]:
+		declarations = split_declarations(text)
+		matcher = difflib.SequenceMatcher(None, [declaration[0] for declaration in merged], [declaration[0] for declaration in declarations], autojunk=False)
+
+		new_merged = []
+		for [opcode, merged_start, merged_end, start, end] in matcher.get_opcodes():
+			if opcode == "equal":
+				for declaration in merged[merged_start:merged_end]:
+					new_merged.append([declaration[0], declaration[1], declaration[2] + [name]])
+				continue
+
+			# Both sides are kept, they're mutually exclusive through `when`
+			new_merged += merged[merged_start:merged_end]
+			new_merged += [[text, in_foreign_block, [name]] for [text, in_foreign_block] in declarations[start:end]]
+		merged = new_merged
+
+	lines = []
+	header_end = 1 # After `package imgui`
+	index = 0
+	while index < len(merged):
+		[text, in_foreign_block, in_configurations] = merged[index]
+		if len(in_configurations) == len(names):
+			lines.append(text)
+			index += 1
+			continue
+
+		# Group up consecutive declarations which are in the same configurations
+		indent = "\t" if in_foreign_block else ""
+		condition = " || ".join(f'IMGUI_CONFIG == "{name}"' for name in in_configurations)
+		lines.append(f"{indent}when {condition} {{")
+		while index < len(merged) and merged[index][1] == in_foreign_block and merged[index][2] == in_configurations:
+			lines += ["\t" + line if line != "" else "" for line in merged[index][0].split("\n")]
+			index += 1
+		lines.append(f"{indent}}}")
+
+	if not declare_config: return "\n".join(lines) + "\n"
+
+	config_names = ", ".join(f'"{name}"' for name in names)
+	lines.insert(header_end, f'\n// Configuration to use, one of {config_names}. Set with eg. `-define:IMGUI_CONFIG={names[-1]}`\nIMGUI_CONFIG :: #config(IMGUI_CONFIG, "{names[0]}")')
+	return "\n".join(lines) + "\n"
+
+def parse_configuration(configuration: str) -> typing.List:
+	""" Parses `name=DEFINE,DEFINE` into [name, [defines]] """
+	[name, _, defines] = configuration.partition("=")
+	if not name.isidentifier(): die(f"Invalid configuration name '{name}', expected eg. 'wchar32=IMGUI_USE_WCHAR32'")
+	return [name, [define.strip() for define in defines.split(",") if define.strip() != ""]]
+
+def configuration_file_name(destination_file: str, name: str) -> str:
+	if "{config}" in destination_file: return destination_file.replace("{config}", name)
+	[stem, extension] = path.splitext(destination_file)
+	return f"{stem}_{name}{extension}"
+
+def helper_report_lines(configuration_name: str) -> typing.List[str]:
+	""" Describes what happened to the default argument helpers and overloads in the last configuration generated """
+	lines = []
+	if configuration_name != None: lines += [f"Configuration {configuration_name}:"]
+	lines += [f"Eliminated {len(_imgui_extended_arg_funcs)} default argument helpers, calls go straight to the full-argument function:"]
+	lines += [f"  {helper} -> {extended}" for [extended, helper] in _imgui_extended_arg_funcs.items()]
+	lines += [f"Kept {len(kept_default_arg_helpers)} default argument helpers, as their full-argument function isn't bound:"]
+	lines += [f"  {helper}" for helper in kept_default_arg_helpers]
+	lines += [f"Wrote {len(generated_proc_groups)} proc groups:"]
+	lines += [f"  {group_name} :: proc{{{', '.join(members)}}}" for [group_name, members] in generated_proc_groups]
+	return lines + [""]
+
+def print_cache_stats():
+	for [cache_name, [hits, misses]] in cache_stats.items():
+		lookups = hits + misses
+		print(f"{cache_name.capitalize() + ' cache:':<20} {hits:>7} hits, {misses:>6} misses ({100 * hits / max(lookups, 1):5.1f}% hit rate)")
+
+	if resource != None:
+		# Kilobytes on Linux, bytes on macOS
+		peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+		print(f"{'Peak RSS:':<20} {peak_rss / (1024 * 1024):7.2f}MiB")
+
+def reset_generator_state():
+	""" Some state is kept in globals while generating. Reset it, so the bindings can be generated more than once per process. """
+	global processed_defines, configured_defines
+	processed_defines = {}
+	configured_defines = []
+	_imgui_extended_arg_funcs.clear()
+	kept_default_arg_helpers.clear()
+	generated_proc_groups.clear()
+
+def start_configuration(defines: typing.List[str]):
+	reset_generator_state()
+	for define in defines:
+		if not define in _configurable_defines: die(f"Define '{define}' can't be set per configuration. Allowed: {', '.join(_configurable_defines)}")
+		add_processed_define(define, "")
+		configured_defines.append(define)
+
+def generate_bindings(bindings: Bindings, defines: typing.List[str] = []) -> str:
+	""" Returns the contents of imgui.odin. Everything is written to memory, so the file itself can be written in one go.
+	`defines` are treated as if they were defined in imconfig.h, see _configurable_defines. """
+	start_configuration(defines)
+
+	output = io.StringIO()
+	write_bindings(output, bindings)
+	return output.getvalue()
+
+# BACKENDS
+# With --backend NAME, the json is dear_bindings' output for imgui_impl_NAME.h (dear_bindings.py --backend), and the
+# imgui_impl_NAME package is written instead of imgui.odin. build.py compiles the backends with IMGUI_IMPL_API as
+# extern "C", so the procs link straight to them, rather than to dear_bindings' wrappers.
+# Types go through the same pipeline as imgui.odin. The backend's own types lose their prefix, types from imgui.h
+# are qualified with the imgui package, and types from the platform or graphics API are mapped with:
+# - prefix: Of the backend's types and functions. Anything else in the header, eg. the ImGui_ImplVulkanH_ helpers, isn't bound.
+# - imports: Odin packages which the mapped types come from
+# - type_prefixes: [C prefix, Odin prefix] for a whole API, eg. VkDevice -> vk.Device
+# - types: Types which the prefixes get wrong, or which don't have one
+# - pointer_types: Pointers which are a handle type in Odin, eg. GLFWwindow* -> glfw.WindowHandle
+# - argument_types: Odin types of arguments, by name, where the C type doesn't say enough: void* standing in for a
+#   platform handle, as some headers avoid including the platform's headers, or T** which is an array of pointers
+# - kept_argument_names: Arguments which keep their name from C, where renaming them (see _disallowed_identifiers) isn't needed
+# - values: Default argument values
+# - defines: Defined while evaluating the header's conditionals. Anything else is undefined.
+# - build: #+build tag, for backends which only build on some platforms
+# - extra_procs: Added to the foreign block
+# - notes, footer: Written before and after the bindings
+# Metal and OSX aren't here, as dear_bindings can't parse their Objective-C headers. Their bindings are hand-written.
+_backend_bindings = {
+	"dx11": {
+		"prefix": "ImGui_ImplDX11_",
+		"imports": ['import "vendor:directx/d3d11"'],
+		"type_prefixes": [["ID3D11", "d3d11.I"]],
+		"build": "windows",
+	},
+	"dx12": {
+		"prefix": "ImGui_ImplDX12_",
+		"imports": ['import "vendor:directx/d3d12"', 'import "vendor:directx/dxgi"'],
+		"type_prefixes": [["ID3D12", "d3d12.I"], ["D3D12_", "d3d12."], ["DXGI_", "dxgi."]],
+		"build": "windows",
+	},
+	"glfw": {
+		"prefix": "ImGui_ImplGlfw_",
+		"imports": ['import "vendor:glfw"'],
+		"pointer_types": { "GLFWwindow": "glfw.WindowHandle", "GLFWmonitor": "glfw.MonitorHandle" },
+		# CharCallback's last argument, so it can't shadow core:c for the arguments after it
+		"kept_argument_names": ["c"],
+	},
+	"opengl3": {
+		"prefix": "ImGui_ImplOpenGL3_",
+	},
+	"sdl2": {
+		"prefix": "ImGui_ImplSDL2_",
+		"imports": ['import sdl "vendor:sdl2"'],
+		"type_prefixes": [["SDL_", "sdl."]],
+		"types": { "_SDL_GameController": "sdl.GameController" },
+		"argument_types": { "manual_gamepads_array": "[^]^sdl.GameController" },
+	},
+	"sdlrenderer2": {
+		"prefix": "ImGui_ImplSDLRenderer2_",
+		"imports": ['import sdl "vendor:sdl2"'],
+		"type_prefixes": [["SDL_", "sdl."]],
+	},
+	"vulkan": {
+		"prefix": "ImGui_ImplVulkan_",
+		"imports": ['import vk "vendor:vulkan"'],
+		"type_prefixes": [["Vk", "vk."]],
+		# vk.SampleCountFlag numbers the bits, so it's the bit_set which matches VkSampleCountFlagBits
+		"types": { "VkSampleCountFlagBits": "vk.SampleCountFlags", "PFN_vkVoidFunction": "vk.ProcVoidFunction" },
+		"values": { "VK_NULL_HANDLE": "{}" },
+		# Defined by imgui_impl_vulkan.h, with any Vulkan headers recent enough for vendor:vulkan
+		"defines": ["IMGUI_IMPL_VULKAN_HAS_DYNAMIC_RENDERING"],
+	},
+	"wgpu": {
+		"prefix": "ImGui_ImplWGPU_",
+		"imports": ['import "vendor:wgpu"'],
+		"type_prefixes": [["WGPU", "wgpu."]],
+		"footer": """// In Dear ImGui, `InitInfo` has a constructor and field defaults. This is the equivalent
+INIT_INFO_DEFAULT :: InitInfo {
+	RenderTargetFormat = .Undefined,
+	DepthStencilFormat = .Undefined,
+	PipelineMultisampleState = {
+		count                  = 1,
+		mask                   = max(u32),
+		alphaToCoverageEnabled = false,
+	}
+}""",
+	},
+	"win32": {
+		"prefix": "ImGui_ImplWin32_",
+		"imports": ['import "core:sys/windows"'],
+		"argument_types": { "hwnd": "windows.HWND", "monitor": "windows.HMONITOR" },
+		"build": "windows",
+		"notes": """// Note a difference between the bindings an the actual impl:
+// In the impl they didn't want to pull in <windows.h>, so they just used void*
+// instead of HWND.
+// ImGui_ImplWin32_WndProcHandler is additionally #if 0'd, for the same reason.
+// This poses no issue for Odin, so we use HWND, and don't #if 0 out this function.""",
+		"extra_procs": [
+			"// Win32 message handler your application need to call.",
+			"// - Call from your application's message handler. Keep calling your message handler unless this function returns TRUE.",
+			["WndProcHandler", " :: proc(hWnd: windows.HWND, msg: windows.UINT, wParam: windows.WPARAM, lParam: windows.LPARAM) -> windows.LRESULT", " ---"],
+		],
+	},
+}
+
+# The backend being generated, from _backend_bindings, plus its "name". None while generating imgui.odin.
+current_backend = None
+# Types which backend_type_odiney() couldn't map. Only an error if they end up in the package.
+unmapped_backend_types = set()
+
+def backend_type_odiney(type_str: str) -> str:
+	""" make_type_odiney(), for types in a backend header """
+	if type_str in _type_aliases: return _type_aliases[type_str]
+	if type_str in current_backend.get("types", {}): return current_backend["types"][type_str]
+
+	prefix = current_backend["prefix"]
+	if type_str.startswith(prefix): return type_str.removeprefix(prefix)
+
+	for [c_prefix, odin_prefix] in current_backend.get("type_prefixes", []):
+		if type_str.startswith(c_prefix): return odin_prefix + type_str.removeprefix(c_prefix)
+
+	if type_str.startswith("Im") and not type_str.startswith("ImGui_Impl"): return "imgui." + strip_imgui_branding(type_str)
+
+	unmapped_backend_types.add(type_str)
+	return type_str
+
+def start_backend(name: str):
+	""" Has to be called before parsing the backend's json, as types are converted while parsing """
+	global current_backend
+	if not name in _backend_bindings: die(f"No bindings metadata for backend '{name}', see _backend_bindings. Known backends: {', '.join(_backend_bindings)}")
+
+	current_backend = dict(_backend_bindings[name], name=name)
+	_pointer_aliases.update(current_backend.get("pointer_types", {}))
+	_odin_value_aliases.update(current_backend.get("values", {}))
+	unmapped_backend_types.clear()
+	clear_caches()
+
+	reset_generator_state()
+	for define in current_backend.get("defines", []): add_processed_define(define, "")
+
+def backend_lib_import(name: str) -> str:
+	""" Like _header_lib_import, but linking the backend's archive as well as the core's """
+	lines = []
+	for [odin_os, system, extension] in [["Windows", "windows", "lib"], ["Linux", "linux", "a"], ["Darwin", "darwin", "a"]]:
+		[x64, arm64] = [f'{{ "../imgui_impl_{name}_{system}_{arch}.{extension}", "../imgui_{system}_{arch}.{extension}" }}' for arch in ["x64", "arm64"]]
+		when = "when     " if len(lines) == 0 else "else when"
+		lines.append(f"{when} ODIN_OS == .{odin_os:<7} {{ when ODIN_ARCH == .amd64 {{ foreign import lib {x64} }} else {{ foreign import lib {arm64} }} }}")
+	return "\n".join(lines)
+
+def write_backend_enums(file: typing.IO, enums: typing.List[Enum]):
+	for enum in enums:
+		if not enum.name.startswith(current_backend["prefix"]) or not passes_conditionals(enum): continue
+
+		element_prefix = enum.name.removesuffix("_") + "_"
+		write_line_with_comments(file, f'{enum.name.removeprefix(current_backend["prefix"])} :: enum c.int {{', enum)
+		aligned = []
+		for element in enum.elements:
+			if not passes_conditionals(element): continue
+			element_name = make_identifier_valid(element.name.removeprefix(element_prefix))
+			if element.value_expression == None: append_aligned_field(aligned, [f"{element_name},"], element)
+			else:                                append_aligned_field(aligned, [element_name, f" = {element.value_expression.replace(element_prefix, '')},"], element)
+		write_aligned_fields(file, aligned, 1)
+		write_line(file, "}")
+		write_line(file)
+
+def write_backend_structs(file: typing.IO, structs: typing.List[Struct]):
+	for struct in structs:
+		if not struct.name.startswith(current_backend["prefix"]) or not passes_conditionals(struct): continue
+
+		write_line_with_comments(file, f'{struct.name.removeprefix(current_backend["prefix"])} :: struct {"#raw_union " if struct.is_union else ""}{{', struct)
+		aligned = []
+		for field in struct.fields:
+			if not passes_conditionals(field): continue
+			if field.width != None: die(f"Bitfield '{struct.name}.{field.name}' in a backend, which isn't handled yet")
+			append_aligned_field(aligned, [f"{field.name}: ", f"{field.type.odin},"], field)
+		write_aligned_fields(file, aligned, 1)
+		write_line(file, "}")
+		write_line(file)
+
+def write_backend_functions(file: typing.IO, functions: typing.List[Function]):
+	prefix = current_backend["prefix"]
+	argument_types = current_backend.get("argument_types", {})
+
+	aligned = []
+	bound = set()
+	for function in functions:
+		# The backend's own functions take every argument, with Odin default values standing in for the C++ ones
+		if function.is_default_argument_helper: continue
+		if function.original_name == None or not function.original_name.startswith(prefix): continue
+		if not passes_conditionals(function) or function_uses_va_list(function): continue
+		# extern "C" can't be overloaded, so only one function can have the name we link to
+		if function.original_name in bound:
+			print(f"Skipping overload of {function.original_name} ({function.name}), as the backend is linked as extern \"C\"")
+			continue
+		bound.add(function.original_name)
+
+		arguments = []
+		for argument in function.arguments:
+			if argument.name in argument_types:
+				argument = replace(argument, type=Type(argument.type.declaration, argument_types[argument.name]))
+			arguments.append(argument)
+
+		signature = function_to_string(replace(function, arguments=arguments), False, current_backend.get("kept_argument_names", []))
+		append_aligned_field(aligned, [function.original_name.removeprefix(prefix), f" :: {signature}", " ---"], function)
+
+	aligned += current_backend.get("extra_procs", [])
+
+	write_line(file, f'@(link_prefix="{prefix}")')
+	write_line(file, "foreign lib {")
+	write_aligned_fields(file, aligned, 1)
+	write_line(file, "}")
+
+def generate_backend_bindings(bindings: Bindings) -> str:
+	""" Returns the contents of imgui_impl_NAME.odin, for the backend passed to start_backend() """
+	name = current_backend["name"]
+	output = io.StringIO()
+	write_line(output, f"// Generated from imgui_impl_{name}.h by gen_odin.py. Edit _backend_bindings in gen_odin.py, rather than this file.")
+	if "notes" in current_backend:
+		write_line(output)
+		write_line(output, current_backend["notes"])
+	write_line(output)
+	write_backend_enums(output, bindings.enums)
+	write_backend_structs(output, bindings.structs)
+	write_backend_functions(output, bindings.functions)
+	if "footer" in current_backend:
+		write_line(output)
+		write_line(output, current_backend["footer"])
+	body = output.getvalue()
+
+	code = re.sub(r"//.*", "", body)
+	unmapped = sorted(type_str for type_str in unmapped_backend_types if re.search(rf"(?<![\w.]){type_str}\b", code) != None)
+	if len(unmapped) > 0: die(f"No Odin type for {', '.join(unmapped)} in backend '{name}'. Add them to _backend_bindings.")
+
+	# Unused imports are an error with -vet
+	header = [f"#+build {current_backend['build']}"] if "build" in current_backend else []
+	header += [f"package imgui_impl_{name}", ""]
+	if re.search(r"\bc\.", body) != None: header += [_header_c_import, ""]
+	imports = current_backend.get("imports", [])
+	if re.search(r"\bimgui\.", body) != None: imports = ['import imgui "../"'] + imports
+	if len(imports) > 0: header += imports + [""]
+	header += [backend_lib_import(name), "", ""]
+
+	return "\n".join(header) + body
+
+# BENCHMARK
+# --benchmark times each stage of generating the bindings, for c_imgui.json and scaled up copies of it, and
+# measures the peak memory use. Results can be saved as a baseline, and later runs compared against it, so
+# that the generator getting slower (or hungrier) is noticed when it happens. Timings are only comparable
+# to a baseline from the same machine.
+
+# Stage timings below this are too noisy to call regressions, whatever the percentage
+_benchmark_noise_seconds = 0.001
+
+def scale_bindings_json(info, factor: int):
+	""" Returns a copy of the dear_bindings json with `factor` times the functions and structs. Copies get a suffix,
+	which goes before Ex, so default argument helpers still find their Ex function. """
+	scaled = dict(info)
+	scaled["functions"] = list(info["functions"])
+	scaled["structs"] = list(info["structs"])
+	for copy_idx in range(1, factor):
+		suffix = f"_{copy_idx}"
+		for function in info["functions"]:
+			function = dict(function)
+			name = function["name"]
+			function["name"] = name.removesuffix("Ex") + suffix + ("Ex" if name.endswith("Ex") else "")
+			if "original_fully_qualified_name" in function: function["original_fully_qualified_name"] += suffix
+			scaled["functions"].append(function)
+		for struct in info["structs"]:
+			scaled["structs"].append(dict(struct, name=struct["name"] + suffix))
+	return scaled
+
+def clear_caches():
+	""" Makes the next run start cold, like a new process would """
+	_type_cache.clear()
+	_conditionals_cache.clear()
+	_conditionals_defines.clear()
+
+def generate_timed(json_path: str, destination_file: str) -> typing.List[typing.List]:
+	""" Generates the bindings from `json_path` into `destination_file`, returning [stage, seconds] for each stage """
+	timings = []
+	def stage(name: str, start: float):
+		now = time.perf_counter()
+		timings.append([name, now - start])
+		return now
+
+	clear_caches()
+	start = time.perf_counter()
+	# Reading and parsing are interleaved, see load_bindings
+	bindings = load_bindings(json_path)
+	start = stage("parse", start)
+
+	start_configuration([])
+	output = io.StringIO()
+	write_header(output)
+	for [name, writer, items] in bindings_sections(bindings):
+		writer(output, items)
+		start = stage(f"write_{name}", start)
+
+	write_file_if_changed(destination_file, output.getvalue())
+	stage("write file", start)
+
+	timings.append(["total", sum(seconds for [_name, seconds] in timings)])
+	return timings
+
+def peak_memory(json_path: str, destination_file: str) -> int:
+	""" Returns the most memory allocated at once while generating, in bytes. Measured separately from the timings, as tracing slows everything down. """
+	import tracemalloc
+	tracemalloc.start()
+	generate_timed(json_path, destination_file)
+	[_current, peak] = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return peak
+
+def run_benchmark(imgui_json: str, runs: int, scales: typing.List[int], baseline_path: str, save_baseline: bool, threshold_percent: float):
+	""" Benchmarks each corpus, then compares against, or saves, the baseline. Exits with 1 if anything regressed. """
+	with open(imgui_json, "r") as file: info = json.load(file)
+
+	results = {} # {corpus: {"seconds": {stage: median}, "peak_bytes": peak}}
+	with tempfile.TemporaryDirectory() as temp_dir:
+		corpus = [[path.basename(imgui_json), imgui_json]]
+		for scale in scales:
+			scaled_json = path.join(temp_dir, f"scaled_{scale}.json")
+			with open(scaled_json, "w") as file: json.dump(scale_bindings_json(info, scale), file)
+			corpus.append([f"{path.basename(imgui_json)} x{scale}", scaled_json])
+
+		for [corpus_name, json_path] in corpus:
+			stage_timings = {} # {stage: [seconds]}
+			for run in range(runs):
+				# A new file each run, so writing is never skipped
+				for [stage, seconds] in generate_timed(json_path, path.join(temp_dir, f"imgui_{run}.odin")):
+					stage_timings.setdefault(stage, []).append(seconds)
+			peak = peak_memory(json_path, path.join(temp_dir, "imgui_traced.odin"))
+
+			print(f"{corpus_name} ({runs} runs)")
+			medians = {}
+			for [stage, timings] in stage_timings.items():
+				timings.sort()
+				medians[stage] = timings[len(timings) // 2]
+				print(f"  {stage:<16} min {timings[0] * 1000:8.2f}ms   median {medians[stage] * 1000:8.2f}ms")
+			print(f"  {'peak memory':<16} {peak / (1024 * 1024):8.2f}MiB")
+			results[corpus_name] = { "seconds": medians, "peak_bytes": peak }
+
+	if save_baseline:
+		with open(baseline_path, "w") as file: json.dump(results, file, indent="\t")
+		print(f"Baseline written to {baseline_path}")
+		return
+
+	if baseline_path == None: return
+	if not path.isfile(baseline_path): die(f"No baseline at '{baseline_path}', create one with --save-baseline")
+	with open(baseline_path, "r") as file: baseline = json.load(file)
+
+	regressions = []
+	limit = 1 + threshold_percent / 100
+	for [corpus_name, result] in results.items():
+		if not corpus_name in baseline: continue
+		for [stage, seconds] in result["seconds"].items():
+			before = baseline[corpus_name]["seconds"].get(stage)
+			if before != None and seconds > before * limit and seconds - before > _benchmark_noise_seconds:
+				regressions.append(f"{corpus_name}, {stage}: {before * 1000:.2f}ms -> {seconds * 1000:.2f}ms (+{100 * (seconds / before - 1):.1f}%)")
+		before = baseline[corpus_name]["peak_bytes"]
+		if result["peak_bytes"] > before * limit:
+			regressions.append(f"{corpus_name}, peak memory: {before / (1024 * 1024):.2f}MiB -> {result['peak_bytes'] / (1024 * 1024):.2f}MiB (+{100 * (result['peak_bytes'] / before - 1):.1f}%)")
+
+	if len(regressions) == 0:
+		print(f"No regressions over {threshold_percent:g}% against {baseline_path}")
+		return
+
+	print(f"Regressions over {threshold_percent:g}% against {baseline_path}:")
+	for regression in regressions: print(f"  {regression}")
+	exit(1)
+
 def main():
 	if not sys.version.startswith("3.11.5"):
 		print("", file=sys.stderr)
@@ -928,19 +2282,85 @@ def main():
 
 	parser.add_argument("imgui_json", default="imgui.json")
 	parser.add_argument("destination_file", default="imgui.odin")
+	parser.add_argument("--config", action="append", default=[], metavar="NAME=DEFINE,...", help=f"Generate a configuration with these defines set. Can be repeated. Allowed defines: {', '.join(_configurable_defines)}")
+	parser.add_argument("--split-configs", action="store_true", help="Write each configuration to its own file (destination_file with {config} replaced, or _NAME appended), instead of one file with `when` blocks")
+	parser.add_argument("--split-files", action="store_true", help="Write each section (defines, enums, structs, functions, typedefs) to its own file next to destination_file, eg. imgui_enums.odin")
+	parser.add_argument("--layout-probe", metavar="PATH", help="Write the C source of a program which prints the layout of every struct to PATH, instead of writing destination_file")
+	parser.add_argument("--layout", metavar="PATH", help="Assert that the structs match the layout printed by the --layout-probe program, which build.py saved to PATH")
+	parser.add_argument("--helper-report", metavar="PATH", help="Write which default argument helpers were eliminated, and which proc groups were written, to PATH")
+	parser.add_argument("--backend", metavar="NAME", help="imgui_json is dear_bindings' output for imgui_impl_NAME.h. Write the imgui_impl_NAME package to destination_file, see _backend_bindings")
+	parser.add_argument("--stats", action="store_true", help="Print hit rates of the type and conditional caches, and the peak resident memory")
+	parser.add_argument("--benchmark", type=int, metavar="RUNS", help="Time each stage of generating the bindings RUNS times, and measure peak memory, instead of writing destination_file")
+	parser.add_argument("--benchmark-scale", type=int, action="append", metavar="N", help="Also benchmark a copy of imgui_json with N times the functions and structs. Can be repeated, defaults to 10")
+	parser.add_argument("--baseline", metavar="PATH", help="With --benchmark, compare against the baseline at PATH, and exit with 1 if anything got slower than --regression-threshold")
+	parser.add_argument("--save-baseline", action="store_true", help="With --benchmark, save the results to --baseline instead of comparing")
+	parser.add_argument("--regression-threshold", type=float, default=15, metavar="PERCENT", help="How much slower, or more memory, than the baseline counts as a regression (default: 15)")
 
 	args = parser.parse_args()
 
-	info = json.load(open(args.imgui_json, "r"))
-	file = open(args.destination_file, "w+")
-
-	# Write the things
-	write_header(file)
-	parse_and_write_defines(file, info["defines"])
-	write_enums(file, info["enums"])
-	write_structs(file, info["structs"])
-	write_functions(file, info["functions"])
-	write_typedefs(file, info["typedefs"])
+	if args.benchmark != None:
+		if args.save_baseline and args.baseline == None: die("--save-baseline needs --baseline PATH")
+		run_benchmark(args.imgui_json, args.benchmark, args.benchmark_scale if args.benchmark_scale != None else [10], args.baseline, args.save_baseline, args.regression_threshold)
+		return
+
+	if args.backend != None: start_backend(args.backend)
+
+	bindings = load_bindings(args.imgui_json)
+
+	if args.backend != None:
+		if not write_file_if_changed(args.destination_file, generate_backend_bindings(bindings)): print(f"{args.destination_file} is up to date")
+		if args.stats: print_cache_stats()
+		return
+
+	if args.layout_probe != None:
+		if not write_file_if_changed(args.layout_probe, layout_probe_source(bindings.structs)): print(f"{args.layout_probe} is up to date")
+		return
+
+	global struct_layout
+	if args.layout != None:
+		with open(args.layout, "r") as file: struct_layout = json.load(file)
+
+	# Write the things. If nothing changed, the file is left alone, so its timestamp doesn't change either.
+	# [configuration name, [[file, contents]]]
+	configurations = [parse_configuration(configuration) for configuration in args.config]
+	if len(configurations) == 0: configurations = [[None, []]]
+
+	generated = []
+	helper_report = []
+	for [name, defines] in configurations:
+		if args.split_files: files = [[split_file_name(args.destination_file, section), text] for [section, text] in generate_split_bindings(bindings, defines)]
+		else:                files = [[args.destination_file, generate_bindings(bindings, defines)]]
+		generated.append([name, files])
+		helper_report += helper_report_lines(name)
+
+	outputs = []
+	if len(args.config) == 0:
+		outputs += generated[0][1]
+	elif args.split_configs:
+		for [name, files] in generated:
+			outputs += [[configuration_file_name(destination_file, name), text] for [destination_file, text] in files]
+	else:
+		for file_idx in range(len(generated[0][1])):
+			configuration_texts = [[name, files[file_idx][1]] for [name, files] in generated]
+			outputs.append([generated[0][1][file_idx][0], merge_configurations(configuration_texts, declare_config=file_idx == 0)])
+
+	# Files from an earlier split build would redeclare everything, or sections which are now empty (eg. layout) linger
+	written_files = set(destination_file for [destination_file, _text] in outputs)
+	for [section, _writer, _items] in bindings_sections(bindings):
+		stale_file = split_file_name(args.destination_file, section)
+		if path.isfile(stale_file) and not stale_file in written_files:
+			print(f"Removing {stale_file}, as nothing is written to it")
+			os.remove(stale_file)
+
+	for [destination_file, text] in outputs:
+		if not write_file_if_changed(destination_file, text):
+			print(f"{destination_file} is up to date")
+
+	if args.helper_report != None:
+		write_file_if_changed(args.helper_report, "\n".join(helper_report))
+		print(f"Eliminated {len(_imgui_extended_arg_funcs)} default argument helpers, wrote {len(generated_proc_groups)} proc groups. Report written to {args.helper_report}")
+
+	if args.stats: print_cache_stats()
 
 	# for k, v in processed_defines.items(): print(k, v)
 
@@ -4,10 +4,10 @@ package imgui_impl_dx11
 import imgui "../"
 import "vendor:directx/d3d11"
 
-when      ODIN_OS == .Windows { foreign import lib "../imgui_windows_x64.lib" }
-else when ODIN_OS == .Linux   { foreign import lib "../imgui_linux_x64.a" }
+when      ODIN_OS == .Windows { foreign import lib { "../imgui_impl_dx11_windows_x64.lib", "../imgui_windows_x64.lib" } }
+else when ODIN_OS == .Linux   { foreign import lib { "../imgui_impl_dx11_linux_x64.a", "../imgui_linux_x64.a" } }
 else when ODIN_OS == .Darwin  {
-	when ODIN_ARCH == .amd64 { foreign import lib "../imgui_darwin_x64.a" } else { foreign import lib "../imgui_darwin_arm64.a" }
+	when ODIN_ARCH == .amd64 { foreign import lib { "../imgui_impl_dx11_darwin_x64.a", "../imgui_darwin_x64.a" } } else { foreign import lib { "../imgui_impl_dx11_darwin_arm64.a", "../imgui_darwin_arm64.a" } }
 }
 
 // imgui_impl_dx11.h
@@ -7,10 +7,10 @@ import imgui "../"
 import "vendor:directx/d3d12"
 import "vendor:directx/dxgi"
 
-when      ODIN_OS == .Windows { foreign import lib "../imgui_windows_x64.lib" }
-else when ODIN_OS == .Linux   { foreign import lib "../imgui_linux_x64.a" }
+when      ODIN_OS == .Windows { foreign import lib { "../imgui_impl_dx12_windows_x64.lib", "../imgui_windows_x64.lib" } }
+else when ODIN_OS == .Linux   { foreign import lib { "../imgui_impl_dx12_linux_x64.a", "../imgui_linux_x64.a" } }
 else when ODIN_OS == .Darwin  {
-	when ODIN_ARCH == .amd64 { foreign import lib "../imgui_darwin_x64.a" } else { foreign import lib "../imgui_darwin_arm64.a" }
+	when ODIN_ARCH == .amd64 { foreign import lib { "../imgui_impl_dx12_darwin_x64.a", "../imgui_darwin_x64.a" } } else { foreign import lib { "../imgui_impl_dx12_darwin_arm64.a", "../imgui_darwin_arm64.a" } }
 }
 
 // imgui_impl_dx12.h
@@ -4,10 +4,10 @@ import "core:c"
 
 import "vendor:glfw"
 
-when      ODIN_OS == .Windows { foreign import lib "../imgui_windows_x64.lib" }
-else when ODIN_OS == .Linux   { foreign import lib "../imgui_linux_x64.a" }
+when      ODIN_OS == .Windows { foreign import lib { "../imgui_impl_glfw_windows_x64.lib", "../imgui_windows_x64.lib" } }
+else when ODIN_OS == .Linux   { foreign import lib { "../imgui_impl_glfw_linux_x64.a", "../imgui_linux_x64.a" } }
 else when ODIN_OS == .Darwin  {
-	when ODIN_ARCH == .amd64 { foreign import lib "../imgui_darwin_x64.a" } else { foreign import lib "../imgui_darwin_arm64.a" }
+	when ODIN_ARCH == .amd64 { foreign import lib { "../imgui_impl_glfw_darwin_x64.a", "../imgui_darwin_x64.a" } } else { foreign import lib { "../imgui_impl_glfw_darwin_arm64.a", "../imgui_darwin_arm64.a" } }
 }
 
 // imgui_impl_glfw.h
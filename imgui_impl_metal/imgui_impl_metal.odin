@@ -10,10 +10,10 @@ import mtl "vendor:darwin/Metal"
 @(require, extra_linker_flags="-lc++")
 foreign import "system:QuartzCore.framework"
 
-when      ODIN_OS == .Windows { foreign import lib "../imgui_windows_x64.lib" }
-else when ODIN_OS == .Linux   { foreign import lib "../imgui_linux_x64.a" }
+when      ODIN_OS == .Windows { foreign import lib { "../imgui_impl_metal_windows_x64.lib", "../imgui_windows_x64.lib" } }
+else when ODIN_OS == .Linux   { foreign import lib { "../imgui_impl_metal_linux_x64.a", "../imgui_linux_x64.a" } }
 else when ODIN_OS == .Darwin  {
-	when ODIN_ARCH == .amd64 { foreign import lib "../imgui_darwin_x64.a" } else { foreign import lib "../imgui_darwin_arm64.a" }
+	when ODIN_ARCH == .amd64 { foreign import lib { "../imgui_impl_metal_darwin_x64.a", "../imgui_darwin_x64.a" } } else { foreign import lib { "../imgui_impl_metal_darwin_arm64.a", "../imgui_darwin_arm64.a" } }
 }
 
 // imgui_impl_metal.h